@@ -0,0 +1,329 @@
+"""
+Load test the server extension, to size a shared lab server for a number of concurrent users.
+
+Starts a Jupyter server with the extension, serving a generated project, then replays a mix of `/lookup`, `/tree`,
+`/newChild` and `/open` requests from many concurrent clients. Throughput, latency percentiles and error rates are
+reported for each endpoint, as a table on stderr and as JSON on stdout (or `--output`), so runs can be compared
+across versions.
+
+    python benchmarks/load_test.py [--children N] [--clients N] [--duration S] [--mix lookup=50,tree=40,open=8,newChild=2]
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+import numpy as np
+from tornado.httpclient import AsyncHTTPClient, HTTPRequest
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from project import make_project  # noqa: E402
+
+from jupyter_cassini_server import __version__  # noqa: E402
+
+
+ROOT = Path(__file__).parent.parent
+
+ENDPOINTS = ["lookup", "tree", "newChild", "open"]
+
+DEFAULT_MIX = "lookup=50,tree=40,open=8,newChild=2"
+
+# appended to the generated project file. /open would otherwise open a file browser for every request.
+NO_OPEN = """
+import cassini.core
+cassini.core.open_file = lambda path: None
+"""
+
+# a request to replay: method, path within the extension and query, and the body for a POST.
+Request = Tuple[str, str, Optional[dict]]
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+
+    for part in mix.split(","):
+        endpoint, _, weight = part.partition("=")
+
+        if endpoint not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint {endpoint}, choose from {', '.join(ENDPOINTS)}")
+
+        weights[endpoint] = float(weight)
+
+    return weights
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(project_file: Path, runtime_dir: Path, port: int, token: str, log: Optional[Path]) -> subprocess.Popen:
+    config_file = runtime_dir / "jupyter_server_config.json"
+    config_file.write_text(json.dumps({
+        "ServerApp": {
+            "jpserver_extensions": {"jupyter_cassini_server": True},
+            "open_browser": False,
+            # jupyter_server refuses to start as root otherwise, e.g. in a container. There's no root on Windows.
+            "allow_root": getattr(os, "geteuid", lambda: -1)() == 0,
+        },
+        "IdentityProvider": {"token": token},
+        "ContentsManager": {"allow_hidden": True},
+    }))
+
+    env = dict(
+        os.environ,
+        CASSINI_PROJECT=project_file.as_posix(),
+        JUPYTER_RUNTIME_DIR=runtime_dir.as_posix(),
+        PYTHONPATH=os.pathsep.join(filter(None, [ROOT.as_posix(), os.environ.get("PYTHONPATH")])),
+    )
+
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "jupyter_server",
+            f"--config={config_file}",
+            f"--port={port}",
+            "--port-retries=0",
+            f"--ServerApp.root_dir={project_file.parent}",
+        ],
+        env=env,
+        cwd=project_file.parent,
+        stdout=subprocess.DEVNULL,
+        stderr=open(log, "w") if log else subprocess.DEVNULL,
+    )
+
+
+async def wait_for_server(
+    server: subprocess.Popen, client: AsyncHTTPClient, base_url: str, headers: dict, timeout: float = 60
+) -> None:
+    end = time.monotonic() + timeout
+
+    while time.monotonic() < end:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}, see --server-log")
+
+        try:
+            response = await client.fetch(f"{base_url}/api/status", headers=headers, raise_error=False)
+
+            if response.code == 200:
+                return
+        except ConnectionError:
+            pass
+
+        await asyncio.sleep(0.2)
+
+    raise RuntimeError(f"Server didn't start within {timeout}s")
+
+
+def make_requests(names: List[str]) -> Dict[str, Callable[[], Request]]:
+    """
+    Functions that make a random request to each endpoint.
+    """
+    new_ids = itertools.count()
+    # run id, so repeated runs against the same project don't clash.
+    run = uuid.uuid4().hex[:6]
+
+    def lookup() -> Request:
+        return "GET", "lookup?" + urlencode({"name": random.choice(names)}), None
+
+    def tree() -> Request:
+        path = random.choice(["", "1", "1/1"])
+        query = ""
+
+        if path == "1/1":
+            # the frontend pages through large branches.
+            query = "?" + urlencode({"limit": 100, "offset": random.randrange(0, len(names), 100)})
+
+        return "GET", f"tree/{path}{query}", None
+
+    def new_child() -> Request:
+        body = {"id": f"load{run}{next(new_ids)}", "parent": "WP1.1", "template": "Sample.tmplt.ipynb"}
+        return "POST", "newChild", body
+
+    def open_() -> Request:
+        return "GET", "open?" + urlencode({"name": random.choice(names)}), None
+
+    return {"lookup": lookup, "tree": tree, "newChild": new_child, "open": open_}
+
+
+async def run_clients(
+    client: AsyncHTTPClient,
+    base_url: str,
+    headers: dict,
+    requests: Dict[str, Callable[[], Request]],
+    mix: Dict[str, float],
+    clients: int,
+    duration: float,
+) -> Dict[str, List[Tuple[float, int]]]:
+    """
+    Send requests from `clients` concurrent clients for `duration` seconds, each waiting for its last response before
+    sending the next.
+
+    Returns the latency and status code of each request, by endpoint. Requests that failed to connect have code 599.
+    """
+    results: Dict[str, List[Tuple[float, int]]] = defaultdict(list)
+    endpoints = list(mix)
+    weights = [mix[endpoint] for endpoint in endpoints]
+    end = time.perf_counter() + duration
+
+    async def run_client() -> None:
+        while time.perf_counter() < end:
+            endpoint = random.choices(endpoints, weights)[0]
+            method, path, body = requests[endpoint]()
+
+            request = HTTPRequest(
+                f"{base_url}/jupyter_cassini/{path}",
+                method=method,
+                headers=headers,
+                body=json.dumps(body) if body is not None else None,
+                request_timeout=120,
+            )
+
+            start = time.perf_counter()
+
+            try:
+                response = await client.fetch(request, raise_error=False)
+                code = response.code
+            except (ConnectionError, OSError):
+                code = 599
+
+            results[endpoint].append((time.perf_counter() - start, code))
+
+    await asyncio.gather(*(run_client() for _ in range(clients)))
+    return results
+
+
+def summarise(samples: List[Tuple[float, int]], duration: float) -> dict:
+    latencies = np.array([latency for latency, _ in samples])
+    codes = Counter(code for _, code in samples)
+    errors = sum(count for code, count in codes.items() if code >= 400)
+
+    if not samples:
+        return {"requests": 0, "errors": 0, "errorRate": 0.0, "throughput": 0.0, "statuses": {}}
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "errorRate": errors / len(samples),
+        "throughput": len(samples) / duration,
+        "mean": float(latencies.mean()),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "max": float(latencies.max()),
+        "statuses": {str(code): count for code, count in sorted(codes.items())},
+    }
+
+
+def print_table(report: dict) -> None:
+    rows = [*report["endpoints"].items(), ("total", report["total"])]
+
+    print(f"{'endpoint':>10} {'requests':>9} {'req/s':>8} {'errors':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}",
+          file=sys.stderr)
+
+    for endpoint, stats in rows:
+        if not stats["requests"]:
+            continue
+
+        print(
+            f"{endpoint:>10} {stats['requests']:>9} {stats['throughput']:>8.1f} {stats['errorRate']:>7.1%} "
+            f"{stats['p50'] * 1000:>8.1f} {stats['p95'] * 1000:>8.1f} {stats['p99'] * 1000:>8.1f}",
+            file=sys.stderr,
+        )
+
+
+async def load_test(args: argparse.Namespace, project_file: Path, names: List[str], runtime_dir: Path) -> dict:
+    port = free_port()
+    token = uuid.uuid4().hex
+    base_url = f"http://127.0.0.1:{port}"
+    headers = {"Authorization": f"token {token}"}
+
+    server = start_server(project_file, runtime_dir, port, token, args.server_log)
+    client = AsyncHTTPClient(force_instance=True, max_clients=args.clients)
+
+    try:
+        await wait_for_server(server, client, base_url, headers)
+        requests = make_requests(names)
+
+        if args.warmup:
+            print(f"Warming up for {args.warmup}s", file=sys.stderr)
+            await run_clients(client, base_url, headers, requests, args.mix, args.clients, args.warmup)
+
+        print(f"Running {args.clients} clients for {args.duration}s", file=sys.stderr)
+        results = await run_clients(client, base_url, headers, requests, args.mix, args.clients, args.duration)
+    finally:
+        client.close()
+        server.terminate()
+        server.wait(timeout=30)
+
+    return {
+        "version": __version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "settings": {
+            "children": args.children,
+            "clients": args.clients,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "mix": args.mix,
+        },
+        "endpoints": {endpoint: summarise(results[endpoint], args.duration) for endpoint in args.mix},
+        "total": summarise([sample for samples in results.values() for sample in samples], args.duration),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--children", type=int, default=5000, help="number of samples in the generated project")
+    parser.add_argument("--clients", type=int, default=20, help="number of concurrent clients")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to send requests for")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds to send requests for before measuring")
+    parser.add_argument("--mix", type=parse_mix, default=DEFAULT_MIX, help="relative weight of each endpoint")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--output", type=Path, help="file to write the JSON results to, defaults to stdout")
+    parser.add_argument("--server-log", type=Path, help="file to write the server's log to")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project = make_project(Path(tmp) / "project", args.children)
+        project_file = project.project_folder / "cas_project.py"
+
+        with open(project_file, "a") as f:
+            f.write(NO_OPEN)
+
+        names = ["WP1", "WP1.1", *(child.name for child in project["WP1.1"])]
+
+        runtime_dir = Path(tmp) / "runtime"
+        runtime_dir.mkdir()
+
+        report = asyncio.run(load_test(args, project_file, names, runtime_dir))
+
+    print_table(report)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
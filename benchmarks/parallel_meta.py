@@ -0,0 +1,74 @@
+"""
+Time serialising the children of a branch in the server process against splitting them across the worker pool, to find
+the branch size above which the pool is worth it. Use the result to set `config.PARALLEL_MIN_CHILDREN`.
+
+    python benchmarks/parallel_meta.py [--workers N] [--repeat N]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from project import make_project  # noqa: E402
+
+from jupyter_cassini_server.config import config  # noqa: E402
+from jupyter_cassini_server.parallel import (  # noqa: E402
+    serialize_children_parallel, serialize_children_serial, shutdown_pool
+)
+
+SIZES = [100, 250, 500, 1000, 2000, 4000, 8000]
+
+
+def best_of(repeat, func, *args) -> float:
+    times = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes, defaults to CPUs")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    config.PARALLEL_WORKERS = args.workers
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project = make_project(Path(tmp), max(SIZES))
+        experiment = project["WP1.1"]
+        children = sorted(experiment, key=lambda child: child.id)
+
+        # start the workers and have them load the project, so that isn't timed.
+        serialize_children_parallel(experiment, children[:100])
+
+        print(f"{'children':>10} {'serial (ms)':>12} {'parallel (ms)':>14} {'speedup':>8}")
+
+        crossover = None
+
+        for size in SIZES:
+            serial = best_of(args.repeat, serialize_children_serial, children[:size])
+            parallel = best_of(args.repeat, serialize_children_parallel, experiment, children[:size])
+
+            if crossover is None and parallel < serial:
+                crossover = size
+
+            print(f"{size:>10} {serial * 1000:>12.1f} {parallel * 1000:>14.1f} {serial / parallel:>8.2f}")
+
+        shutdown_pool()
+
+    if crossover is None:
+        print("\nThe pool was never faster, leave PARALLEL_MIN_CHILDREN = None")
+    else:
+        print(f"\nThe pool is faster from {crossover} children, set PARALLEL_MIN_CHILDREN = {crossover}")
+
+
+if __name__ == "__main__":
+    main()
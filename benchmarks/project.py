@@ -0,0 +1,66 @@
+"""
+Generate large projects to benchmark against.
+
+Meta files are written directly rather than with `setup_files`, which is far too slow for thousands of samples.
+"""
+import contextlib
+import io
+import json
+import sys
+from pathlib import Path
+
+from cassini import env
+from cassini.utils import find_project
+
+
+PROJECT_FILE = """\
+from cassini import DEFAULT_TIERS, Project
+
+project = Project(DEFAULT_TIERS, __file__)
+"""
+
+PARAGRAPH = (
+    "Annealed at 400C for 2 hours under nitrogen, then cooled slowly. The film looked uniform under the microscope "
+    "but there were a few pinholes near the edge of the substrate."
+)
+
+
+def make_meta(i: int) -> dict:
+    return {
+        "started": f"2023-01-{i % 28 + 1:02}T12:00:00Z",
+        "description": "\n".join([PARAGRAPH] * 3),
+        "conclusion": "\n".join([PARAGRAPH] * 2),
+        "temperature": 300 + i % 100,
+        "status": ["done", "todo", "failed"][i % 3],
+        "tags": ["anneal", "nitrogen", f"batch{i % 10}"],
+    }
+
+
+def make_project(folder: Path, n_samples: int):
+    """
+    Create a project in `folder` with `n_samples` samples in WP1.1 and load it.
+
+    Returns the project.
+    """
+    folder.mkdir(parents=True, exist_ok=True)
+    (folder / "cas_project.py").write_text(PROJECT_FILE)
+
+    env._reset()
+    sys.modules.pop("cas_project", None)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        project = find_project((folder / "cas_project.py").as_posix())
+        project.setup_files()
+        project["WP1"].setup_files()
+        project["WP1.1"].setup_files()
+
+    experiment = project["WP1.1"]
+    meta_folder = experiment.folder / ".smpls"
+    meta_folder.mkdir(exist_ok=True)
+
+    for i in range(n_samples):
+        sample = experiment[f"s{i:05}"]
+        sample.meta_file.write_text(json.dumps(make_meta(i)))
+        sample.file.touch()
+
+    return project
@@ -0,0 +1,43 @@
+"""
+Time parsing and validating the queries of GET requests, as `with_types` does for every request, with and without
+the cache of validated queries.
+
+    python benchmarks/query_parsing.py [--number N]
+"""
+import argparse
+import timeit
+from typing import Dict, Type
+
+from pydantic import BaseModel
+
+from jupyter_cassini_server.safety import QueryCache, validate_get_query
+from jupyter_cassini_server.schema.models import LookupGetParametersQuery, TreePathQuery
+
+
+CASES: Dict[str, tuple] = {
+    "lookup": (LookupGetParametersQuery, "name=WP1.1a", {}),
+    "tree": (TreePathQuery, "", {"path": "/1/1"}),
+    "tree paged": (TreePathQuery, "sort=started&limit=100&offset=200", {"path": "/1/1"}),
+}
+
+
+def time_per_call(number: int, model: Type[BaseModel], raw_query: str, path_kwargs: dict, cache=None) -> float:
+    return timeit.timeit(lambda: validate_get_query(model, raw_query, path_kwargs, cache), number=number) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=20_000)
+    args = parser.parse_args()
+
+    print(f"{'query':>12} {'uncached':>10} {'cached':>10} {'speedup':>8}")
+
+    for name, (model, raw_query, path_kwargs) in CASES.items():
+        uncached = time_per_call(args.number, model, raw_query, path_kwargs)
+        cached = time_per_call(args.number, model, raw_query, path_kwargs, QueryCache())
+
+        print(f"{name:>12} {uncached * 1e6:>8.1f}us {cached * 1e6:>8.1f}us {uncached / cached:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
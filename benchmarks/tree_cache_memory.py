@@ -0,0 +1,69 @@
+"""
+Compare the memory used by caching the children of a branch as `TreeChildResponse` models against the compact records
+of `BranchCache`.
+
+    python benchmarks/tree_cache_memory.py [--children N]
+"""
+import argparse
+import gc
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+
+from project import make_project  # noqa: E402
+
+from jupyter_cassini_server.cache import TreeCache  # noqa: E402
+from jupyter_cassini_server.config import config  # noqa: E402
+from jupyter_cassini_server.parallel import serialize_children_serial  # noqa: E402
+
+
+def measure(func):
+    """
+    Bytes still allocated by `func` once it's returned, along with what it returned.
+    """
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    result = func()
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0] - before, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--children", type=int, default=20_000)
+    args = parser.parse_args()
+
+    config.PARALLEL_MIN_CHILDREN = None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        project = make_project(Path(tmp), args.children)
+        experiment = project["WP1.1"]
+        children = list(experiment)
+
+        # load cassini's own caches first, so they aren't counted.
+        serialize_children_serial(children)
+
+        tracemalloc.start()
+        naive_size, naive = measure(lambda: serialize_children_serial(children))
+        del naive
+        compact_size, branch = measure(lambda: TreeCache().get(experiment))
+        tracemalloc.stop()
+
+        start = time.perf_counter()
+        branch.materialize()
+        materialize_time = time.perf_counter() - start
+
+    print(f"{args.children} children")
+    print(f"{'models':>10}: {naive_size / 1e6:8.1f} MB ({naive_size / args.children:.0f} B per child)")
+    print(f"{'compact':>10}: {compact_size / 1e6:8.1f} MB ({compact_size / args.children:.0f} B per child, "
+          "including stamps)")
+    print(f"{'saving':>10}: {1 - compact_size / naive_size:8.0%}")
+    print(f"materialising every child takes {materialize_time * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
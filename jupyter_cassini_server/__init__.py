@@ -1,3 +1,4 @@
+import atexit
 import sys
 import os
 from pathlib import Path
@@ -6,9 +7,17 @@ import logging
 
 from cassini import env
 from cassini.utils import find_project
+from tornado.ioloop import PeriodicCallback
 
 from ._version import __version__
+from .config import config
 from .handlers import setup_handlers
+from .monitor import monitor
+from .parallel import shutdown_pool
+from .persist import load_caches, save_caches, save_caches_in_background, snapshot_file
+
+
+_snapshot_callback = None
 
 
 def _jupyter_labextension_paths():
@@ -39,3 +48,44 @@ def _load_jupyter_server_extension(server_app):
     server_app.log.info(
         "Registered HelloWorld extension at URL path /jupyter_cassini_server"
     )
+
+    if config.CACHE_SNAPSHOT:
+        _start_cache_snapshots(server_app)
+
+    if config.MONITOR:
+        monitor.start(server_app.log)
+        server_app.log.info("Monitoring the event loop, see /jupyter_cassini/monitor")
+
+    # jupyter_server only calls the shutdown hooks of ExtensionApps, so clean up when the process exits instead.
+    atexit.unregister(_shutdown)
+    atexit.register(_shutdown, server_app.log)
+
+
+def _start_cache_snapshots(server_app):
+    global _snapshot_callback
+
+    project = env.project
+    loaded = load_caches(project)
+    server_app.log.info(f"Loaded {loaded} cached branches from {snapshot_file(project)}")
+
+    if config.CACHE_SNAPSHOT_INTERVAL:
+        _snapshot_callback = PeriodicCallback(
+            lambda: save_caches_in_background(project), config.CACHE_SNAPSHOT_INTERVAL * 1000
+        )
+        _snapshot_callback.start()
+
+
+def _shutdown(log):
+    """Stops the worker processes used to serialise large branches and the monitor, and saves the caches if enabled."""
+    global _snapshot_callback
+
+    shutdown_pool()
+    monitor.stop()
+
+    if _snapshot_callback:
+        _snapshot_callback.stop()
+        _snapshot_callback = None
+
+    if config.CACHE_SNAPSHOT and env.project:
+        save_caches(env.project)
+        log.info(f"Saved caches to {snapshot_file(env.project)}")
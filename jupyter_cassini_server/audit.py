@@ -0,0 +1,236 @@
+"""
+Checking every meta file in the project against its tier's meta model.
+
+Meta is otherwise only validated when a tier is opened, so broken files can go unnoticed for a long time. Tiers are
+walked in order of ids (see `iter_tiers`) and their meta files validated a chunk at a time, using the worker pool if
+`config.AUDIT_PARALLEL` is on. Only a few chunks are in flight at once, so memory use doesn't grow with the project.
+
+Run from the command line with:
+
+    cassini-audit path/to/cas_project.py --checkpoint audit.checkpoint
+"""
+import argparse
+import sys
+from collections import deque
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from cassini import Project, env
+from cassini.core import NotebookTierBase, TierABC
+from cassini.utils import find_project
+
+from .cache import id_sort_key
+from .config import config
+from .export import iter_tiers
+from .parallel import _load_project, find_project_file, get_pool, worker_count
+from .schema.models import AuditError, AuditRecord, Kind
+
+
+def _walk_key(tier: TierABC) -> Tuple[Any, ...]:
+    # tiers are walked depth first in order of ids, which is the order of these keys.
+    return tuple(id_sort_key(id_) for id_ in tier.identifiers)
+
+
+def iter_meta_tiers(root: TierABC, after: Optional[TierABC] = None) -> Iterator[NotebookTierBase]:
+    """
+    Walk down from `root`, yielding each tier that has a meta file.
+
+    after : TierABC
+        skip tiers up to and including this one. Branches that were entirely before it aren't visited.
+    """
+    after_key = _walk_key(after) if after else None
+
+    def descend(tier: TierABC) -> bool:
+        if after_key is None:
+            return True
+        key = _walk_key(tier)
+        # visit branches that are after `after`, or that contain it.
+        return key > after_key or after_key[:len(key)] == key
+
+    for tier, snapshot in iter_tiers(root, descend):
+        if after_key is not None and _walk_key(tier) <= after_key:
+            continue
+
+        if isinstance(tier, NotebookTierBase) and snapshot.exists(tier.meta_file):
+            yield tier
+
+
+def validate_meta(tier: NotebookTierBase) -> Optional[AuditRecord]:
+    """
+    Validate the meta file of `tier` against its meta model. Returns a `failure` record if it's invalid.
+    """
+    try:
+        tier.meta_model.model_validate_json(tier.meta_file.read_text(encoding="utf-8"), strict=False)
+        return None
+    except ValidationError as e:
+        errors = [
+            AuditError(loc=".".join(str(part) for part in error["loc"]), msg=error["msg"], type=error["type"])
+            for error in e.errors()
+        ]
+    except (OSError, UnicodeDecodeError) as e:
+        errors = [AuditError(loc="", msg=str(e), type=e.__class__.__name__)]
+
+    assert env.project
+    return AuditRecord(
+        kind=Kind.failure,
+        name=tier.name,
+        metaPath=tier.meta_file.relative_to(env.project.project_folder).as_posix(),
+        errors=errors,
+    )
+
+
+def _validate_chunk(project_file: str, names: List[str]) -> List[Dict[str, Any]]:
+    """
+    Runs in a worker. Returns the failure records of the tiers called `names`, as dicts.
+    """
+    project = _load_project(project_file)
+    failures = []
+
+    for name in names:
+        failure = validate_meta(project[name])
+
+        if failure:
+            failures.append(failure.model_dump())
+
+    return failures
+
+
+def _chunks(tiers: Iterable[NotebookTierBase], size: int) -> Iterator[List[NotebookTierBase]]:
+    chunk = []
+
+    for tier in tiers:
+        chunk.append(tier)
+
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+
+    if chunk:
+        yield chunk
+
+
+def _validate_chunks(
+    project: Project, chunks: Iterator[List[NotebookTierBase]]
+) -> Iterator[Tuple[List[NotebookTierBase], List[AuditRecord]]]:
+    """
+    Validate each chunk, yielding each along with its failures, in the order given.
+
+    Chunks are only spread across the worker pool if `config.AUDIT_PARALLEL` is on. A chunk whose worker fails is
+    validated again here, so its files are reported just as they would be without the pool.
+    """
+    use_pool = config.AUDIT_PARALLEL and worker_count() > 1
+    project_file = find_project_file(project) if use_pool else None
+
+    if project_file is None:
+        for chunk in chunks:
+            yield chunk, _validate_serial(chunk)
+        return
+
+    pool = get_pool()
+    in_flight: Deque[Tuple[List[NotebookTierBase], Future]] = deque()
+
+    for chunk in chunks:
+        in_flight.append((chunk, pool.submit(_validate_chunk, project_file, [tier.name for tier in chunk])))
+
+        # enough to keep every worker busy, without reading ahead through the whole project.
+        if len(in_flight) >= worker_count() * 2:
+            yield _chunk_result(*in_flight.popleft())
+
+    while in_flight:
+        yield _chunk_result(*in_flight.popleft())
+
+
+def _validate_serial(chunk: List[NotebookTierBase]) -> List[AuditRecord]:
+    return [failure for tier in chunk if (failure := validate_meta(tier))]
+
+
+def _chunk_result(
+    chunk: List[NotebookTierBase], future: Future
+) -> Tuple[List[NotebookTierBase], List[AuditRecord]]:
+    try:
+        failures = future.result()
+    except Exception:
+        # e.g. the worker couldn't load the project, or died.
+        return chunk, _validate_serial(chunk)
+
+    return chunk, [AuditRecord.model_validate(failure) for failure in failures]
+
+
+def iter_audit(root: TierABC, after: Optional[TierABC] = None) -> Iterator[AuditRecord]:
+    """
+    Validate the meta file of every tier from `root` down, yielding a `failure` record for each invalid one, a
+    `progress` record after each chunk and a `done` record at the end.
+
+    after : TierABC
+        resume an audit, skipping tiers up to and including this one.
+    """
+    checked = 0
+    failed = 0
+    last = after.name if after else None
+
+    chunks = _chunks(iter_meta_tiers(root, after), config.AUDIT_CHUNK_SIZE)
+
+    for chunk, failures in _validate_chunks(root.project, chunks):
+        checked += len(chunk)
+        failed += len(failures)
+        last = chunk[-1].name
+
+        yield from failures
+        yield AuditRecord(kind=Kind.progress, checked=checked, failed=failed, last=last)
+
+    yield AuditRecord(kind=Kind.done, checked=checked, failed=failed, last=last)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Check every meta file in a cassini project against its tier's meta model. Failures are "
+        "printed to stdout as JSON lines, progress to stderr."
+    )
+    parser.add_argument("project", nargs="?", help="import string of the project, defaults to CASSINI_PROJECT")
+    parser.add_argument("--root", help="name of the tier to start from, defaults to Home")
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help="file to record progress in. If it exists, the audit resumes from it, and it's removed once done",
+    )
+    parser.add_argument(
+        "--parallel", action="store_true", help="validate meta files across a pool of worker processes"
+    )
+    args = parser.parse_args(argv)
+
+    config.AUDIT_PARALLEL = args.parallel
+    project = find_project(args.project)
+    root = project[args.root] if args.root else project.home
+
+    after = None
+
+    if args.checkpoint and args.checkpoint.exists():
+        after = project[args.checkpoint.read_text().strip()]
+        print(f"Resuming after {after.name}", file=sys.stderr)
+
+    failed = 0
+
+    for record in iter_audit(root, after):
+        if record.kind is Kind.failure:
+            print(record.model_dump_json(exclude_none=True), flush=True)
+        else:
+            failed = record.failed or 0
+            print(f"{record.kind.value}: checked {record.checked}, {failed} failed", file=sys.stderr)
+
+            if args.checkpoint and record.last:
+                args.checkpoint.write_text(record.last)
+
+    if args.checkpoint and args.checkpoint.exists():
+        args.checkpoint.unlink()
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    # use the functions from the package rather than __main__, so workers can find them.
+    from jupyter_cassini_server.audit import main as _main
+
+    sys.exit(_main())
@@ -0,0 +1,426 @@
+import datetime
+import json
+import math
+import sys
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from cassini import env
+from cassini.core import NotebookTierBase, TierABC
+
+from .schema.models import TreeChildResponse
+from .parallel import serialize_children
+from .snapshot import DirSnapshot, Stamp
+
+
+ChildStamp = Tuple[Stamp, bool]
+
+
+def id_sort_key(id_: str) -> Tuple[int, Any]:
+    """
+    Sort ids numerically where possible, so 2 comes before 10.
+    """
+    if id_.isdigit():
+        return (0, int(id_))
+    return (1, id_)
+
+
+def _sort_value(value: Any) -> Tuple[int, Any]:
+    if isinstance(value, datetime.datetime):
+        return (0, value.timestamp())
+    if isinstance(value, (int, float)):
+        return (0, value)
+    return (1, str(value))
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return json.dumps(value, default=str)
+
+
+# meta keys and short string values repeat across children, so are only stored once.
+_key_tuples: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+MAX_INTERNED_VALUE = 64
+
+_PATH_FIELDS = {"notebookPath": "notebook", "metaPath": "meta", "hltsPath": "hlts"}
+
+
+def intern_keys(keys: Iterable[str]) -> Tuple[str, ...]:
+    """
+    Get a shared tuple of interned `keys`, children with the same meta keys then share the same tuple.
+    """
+    keys = tuple(sys.intern(key) for key in keys)
+    return _key_tuples.setdefault(keys, keys)
+
+
+def _intern_value(value: Any) -> Any:
+    if isinstance(value, str) and len(value) <= MAX_INTERNED_VALUE:
+        return sys.intern(value)
+    return value
+
+
+def _strip_prefix(path: Optional[str], prefix: str) -> Optional[str]:
+    if path is None:
+        return None
+    if path.startswith(prefix):
+        return path[len(prefix):]
+    # Paths are relative to the project folder, so never start with a /, use that to mark paths outside `prefix`.
+    return "/" + path
+
+
+def _add_prefix(path: Optional[str], prefix: str) -> Optional[str]:
+    if path is None:
+        return None
+    if path.startswith("/"):
+        return path[1:]
+    return prefix + path
+
+
+class CompactChild:
+    """
+    A serialised child, stored without the overhead of a pydantic model.
+
+    Paths are stored relative to the folder of the branch (see `BranchCache.prefix`) and meta is stored as a shared
+    tuple of keys and a tuple of values. Use `to_model` to get the `TreeChildResponse` back.
+    """
+
+    __slots__ = ("name", "info", "outcome", "started", "notebook", "meta", "hlts", "meta_keys", "meta_values")
+
+    name: str
+    info: Optional[str]
+    outcome: Optional[str]
+    started: Optional[datetime.datetime]
+    notebook: Optional[str]
+    meta: Optional[str]
+    hlts: Optional[str]
+    meta_keys: Tuple[str, ...]
+    meta_values: Tuple[Any, ...]
+
+    @classmethod
+    def from_model(cls, child: TreeChildResponse, prefix: str) -> "CompactChild":
+        record = cls()
+        record.name = child.name
+        record.info = child.info
+        record.outcome = child.outcome
+        record.started = child.started
+        record.notebook = _strip_prefix(child.notebookPath, prefix)
+        record.meta = _strip_prefix(child.metaPath, prefix)
+        record.hlts = _strip_prefix(child.hltsPath, prefix)
+
+        additional_meta = child.additionalMeta or {}
+        record.meta_keys = intern_keys(additional_meta)
+        record.meta_values = tuple(_intern_value(value) for value in additional_meta.values())
+        return record
+
+    def meta_value(self, key: str) -> Any:
+        """
+        Get a value of `additionalMeta`, `None` if it's not there.
+        """
+        try:
+            return self.meta_values[self.meta_keys.index(key)]
+        except ValueError:
+            return None
+
+    def get(self, field: str, prefix: str) -> Any:
+        """
+        Get the value of a field of `TreeChildResponse`, other than `additionalMeta`.
+        """
+        if field in _PATH_FIELDS:
+            return _add_prefix(getattr(self, _PATH_FIELDS[field]), prefix)
+        return getattr(self, field)
+
+    def to_model(self, prefix: str) -> TreeChildResponse:
+        # Built from an already validated model, so there's no need to validate again.
+        return TreeChildResponse.model_construct(
+            name=self.name,
+            info=self.info,
+            outcome=self.outcome,
+            started=self.started,
+            metaPath=_add_prefix(self.meta, prefix),
+            hltsPath=_add_prefix(self.hlts, prefix),
+            notebookPath=_add_prefix(self.notebook, prefix),
+            additionalMeta=dict(zip(self.meta_keys, self.meta_values)),
+        )
+
+
+def get_field(id_: str, child: CompactChild, field: str, prefix: str = "") -> Any:
+    """
+    Get the value of `field` for a child. `field` can be `id`, any field of `TreeChildResponse` or
+    `additionalMeta.<key>`.
+
+    prefix: str
+        the `BranchCache.prefix` of the child, needed to get its paths.
+    """
+    if field == "id":
+        return id_
+
+    if field.startswith("additionalMeta."):
+        return child.meta_value(field[len("additionalMeta."):])
+
+    if field not in TreeChildResponse.model_fields or field == "additionalMeta":
+        raise ValueError("Invalid field", field)
+
+    return child.get(field, prefix)
+
+
+class BranchCache:
+    """
+    The serialised children of a tier, along with the stamps used to tell if they're stale.
+
+    Children are kept as `CompactChild` records, use `materialize` to get `TreeChildResponse`s to send.
+
+    Sort indexes are built the first time a field is sorted by, and are kept until the branch changes.
+
+    Attributes
+    ----------
+    name : str
+        name of the tier.
+    prefix : str
+        folder of the tier relative to the project folder, with a trailing `/`. Paths of the children are stored
+        relative to this.
+    children : Dict[str, CompactChild]
+        serialised children, by id.
+    stamps : Dict[str, ChildStamp]
+        `(mtime_ns, size)` of each child's meta file when it was serialised, `(0, 0)` for children without meta, and
+        whether its highlights file existed.
+    sort_indexes : Dict[str, List[str]]
+        sort -> ids of children in that order.
+    """
+
+    def __init__(self, name: str = "", prefix: str = "") -> None:
+        self.name = name
+        self.prefix = prefix
+        self.children: Dict[str, CompactChild] = {}
+        self.stamps: Dict[str, ChildStamp] = {}
+        self.sort_indexes: Dict[str, List[str]] = {}
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # sort indexes are rebuilt when needed, and can be added to while a snapshot is pickled in another thread.
+        return {**self.__dict__, "sort_indexes": {}}
+
+    def sort_index(self, sort: str) -> List[str]:
+        """
+        Get the ids of the children sorted by `sort`, a field name, prefixed with `-` for descending order.
+
+        Ties are broken by id. Children without a value for the field are always last.
+        """
+        if sort not in self.sort_indexes:
+            descending = sort.startswith("-")
+            field = sort.lstrip("-")
+
+            valued = []
+            missing = []
+
+            for id_ in sorted(self.children, key=id_sort_key):
+                value = get_field(id_, self.children[id_], field, self.prefix)
+
+                if value is None:
+                    missing.append(id_)
+                else:
+                    valued.append((_sort_value(value), id_))
+
+            valued.sort(key=lambda pair: pair[0], reverse=descending)
+            self.sort_indexes[sort] = [id_ for _, id_ in valued] + missing
+
+        return self.sort_indexes[sort]
+
+    def select(self, sort: Optional[str] = None, filter: Optional[str] = None) -> List[str]:
+        """
+        Get the ids of children, optionally sorted and filtered.
+
+        Parameters
+        ----------
+        sort : str
+            field to sort by, prefix with `-` to sort in descending order. Children without a value are always last.
+        filter : str
+            of the form `<field>:<value>`, only children where the formatted value of `field` equals `value` are kept.
+        """
+        if sort:
+            ids = self.sort_index(sort)
+        else:
+            ids = sorted(self.children, key=id_sort_key)
+
+        if filter:
+            field, sep, expected = filter.partition(":")
+
+            if not sep:
+                raise ValueError("Invalid filter, should be of the form <field>:<value>", filter)
+
+            ids = [
+                id_
+                for id_ in ids
+                if (value := get_field(id_, self.children[id_], field, self.prefix)) is not None
+                and _format_value(value) == expected
+            ]
+
+        return ids
+
+    def materialize(self, ids: Optional[Iterable[str]] = None) -> Dict[str, TreeChildResponse]:
+        """
+        Get the `TreeChildResponse` of each child in `ids`, or all children if not given.
+        """
+        if ids is None:
+            ids = self.children
+
+        return {id_: self.children[id_].to_model(self.prefix) for id_ in ids}
+
+    def most_recent(self, count: int) -> List[str]:
+        """
+        Ids of the `count` most recently started children, most recent first. Children never started are left out.
+        """
+        return [id_ for id_ in self.sort_index("-started")[:count] if self.children[id_].started is not None]
+
+    def meta_keys(self) -> Set[str]:
+        """
+        All the keys used in the `additionalMeta` of the children.
+        """
+        keys: Set[str] = set()
+
+        for key_tuple in {child.meta_keys for child in self.children.values()}:
+            keys.update(key_tuple)
+
+        return keys
+
+
+class TreeCache:
+    """
+    Caches the serialised children of each branch, so they don't need to be re-read from disk every request.
+
+    Each time a branch is requested, its children are listed and the stamp of each meta file is checked. Only children
+    that are new or whose meta has changed are serialised again, across worker processes if there are enough of them
+    (see `config.PARALLEL_MIN_CHILDREN`).
+
+    Branches are keyed by folder, and the storage is created with `env.create_cache()`, so it's cleared with the
+    rest of cassini's caches.
+
+    Changes noticed along the way are counted with generations. Each change bumps `generation`, and the tiers
+    affected are recorded against it in `generations`, so clients can ask what's changed since they last looked.
+
+    Attributes
+    ----------
+    epoch : str
+        unique to this instance, generations from different epochs can't be compared.
+    generation : int
+        current generation.
+    generations : Dict[str, int]
+        name of each tier that's changed -> generation it last changed at.
+    refreshed : float
+        `time.monotonic()` of the last `refresh`.
+    """
+
+    def __init__(self) -> None:
+        self.branches: Dict[str, BranchCache] = env.create_cache()
+        self.epoch = uuid.uuid4().hex
+        self.generation = 0
+        self.generations: Dict[str, int] = env.create_cache()
+        self.refreshed = -math.inf
+
+    def bump(self, *names: str) -> int:
+        """
+        Record that the tiers called `names` have changed. Returns the new generation.
+        """
+        self.generation += 1
+
+        for name in names:
+            self.generations[name] = self.generation
+
+        return self.generation
+
+    def changes(self, since: int) -> Dict[str, int]:
+        """
+        Get the tiers that have changed since generation `since`, name -> generation.
+        """
+        return {name: generation for name, generation in self.generations.items() if generation > since}
+
+    def refresh(self, min_interval: float = 0) -> bool:
+        """
+        Check every cached branch for changes, so changes made outside the server are counted.
+
+        This lists and stats the children of every cached branch, so for a large project it's slow. If the last check
+        was less than `min_interval` seconds ago, it's skipped and `False` returned.
+        """
+        assert env.project
+
+        now = time.monotonic()
+
+        if now - self.refreshed < min_interval:
+            return False
+
+        self.refreshed = now
+        snapshot = DirSnapshot()
+
+        for key, branch in list(self.branches.items()):
+            tier = env.project[branch.name]
+
+            if snapshot.tier_exists(tier):
+                self.get(tier, snapshot)
+            else:
+                del self.branches[key]
+                self.bump(branch.name)
+
+        return True
+
+    def get(self, tier: TierABC, snapshot: Optional[DirSnapshot] = None) -> BranchCache:
+        """
+        Get the up to date `BranchCache` for `tier`.
+
+        snapshot: DirSnapshot
+            used to stat the children's files, if not given, a new one is made.
+        """
+        if snapshot is None:
+            snapshot = DirSnapshot()
+
+        key = tier.folder.as_posix()
+        old = self.branches.get(key)
+        branch = BranchCache(tier.name, tier.folder.relative_to(tier.project.project_folder).as_posix() + "/")
+        stale = []
+
+        for child in tier:
+            stamp: ChildStamp
+
+            if isinstance(child, NotebookTierBase):
+                hlts_exists = bool(child.highlights_file and snapshot.exists(child.highlights_file))
+                stamp = (snapshot.stamp(child.meta_file), hlts_exists)
+            else:
+                stamp = ((0, 0), False)
+
+            if old and old.stamps.get(child.id) == stamp:
+                branch.children[child.id] = old.children[child.id]
+            else:
+                stale.append(child)
+
+            branch.stamps[child.id] = stamp
+
+        if stale:
+            for id_, child in serialize_children(tier, stale, snapshot).items():
+                branch.children[id_] = CompactChild.from_model(child, branch.prefix)
+
+        if old and old.stamps == branch.stamps:
+            # nothing changed, hang onto the sort indexes.
+            return old
+
+        if old:
+            # changes to the set of children are recorded against the tier, and edits against the child too.
+            edited = [
+                branch.children[id_].name
+                for id_, stamp in branch.stamps.items()
+                if id_ in old.stamps and old.stamps[id_] != stamp
+            ]
+            self.bump(tier.name, *edited)
+
+        self.branches[key] = branch
+        return branch
+
+    def invalidate(self, tier: TierABC) -> None:
+        """
+        Forget the cached children of `tier`, and record it as changed.
+        """
+        self.branches.pop(tier.folder.as_posix(), None)
+        self.bump(tier.name)
+
+
+tree_cache = TreeCache()
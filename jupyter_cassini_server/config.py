@@ -0,0 +1,92 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class Config:
+    """
+    Configuration for the server extension.
+
+    Change these from your project file (which is run as the server extension loads) e.g.
+
+        from jupyter_cassini_server.config import config
+        config.MAX_META_VALUE_SIZE = 100_000
+
+    Attributes
+    ----------
+    MAX_META_VALUE_SIZE : Optional[int]
+        `additionalMeta` values whose JSON encoding is longer than this are sent as a `LazyMetaValue` placeholder,
+        which can then be fetched from the `/metaValue` endpoint. `None` to always send values in full.
+    EXPORT_FLUSH_EVERY : int
+        number of records the `/export` endpoint writes between flushes. Flushing hands control back to the event
+        loop, so other requests can be served during an export.
+    PARALLEL_MIN_CHILDREN : Optional[int]
+        branches with at least this many children to (re)serialise have them split across a pool of worker processes.
+        Below this, starting the work in other processes costs more than it saves. `None`, the default, to always
+        serialise in the server process. Workers each run the project file, so only turn this on if
+        `benchmarks/parallel_meta.py` finds a crossover on your machine, and set it to that.
+    PARALLEL_WORKERS : Optional[int]
+        number of worker processes, defaults to the number of CPUs. With one worker, branches are always serialised
+        in the server process.
+    CACHE_SNAPSHOT : bool
+        save the server's caches to `CACHE_SNAPSHOT_FILE` when it stops, and every `CACHE_SNAPSHOT_INTERVAL`, and
+        reload them when it starts, so the first requests after a restart are fast. The snapshot is a pickle, so must
+        be as trusted as the project file.
+    CACHE_SNAPSHOT_FILE : str
+        name of the snapshot file, within the project folder.
+    CACHE_SNAPSHOT_INTERVAL : Optional[float]
+        seconds between saves while the server is running, `None` to only save when it stops.
+    CHANGES_REFRESH_INTERVAL : float
+        `/changes` checks every cached branch for changes made outside the server, at most once every this many
+        seconds. Calls in between just report the changes already counted. `0` to check on every call.
+    META_WRITE_WORKERS : int
+        number of threads `/updateMeta` uses to write meta files.
+    AUDIT_CHUNK_SIZE : int
+        number of meta files each worker validates at a time during an audit. A `progress` record is sent after each.
+    AUDIT_PARALLEL : bool
+        validate meta files across the pool of worker processes (see `PARALLEL_WORKERS`) during an audit. Off by
+        default, as each worker runs the project file, and the pool is kept until the server stops.
+    PREFETCH_HINTS : int
+        number of the most recently started children `/tree` suggests the frontend fetches the branches of ahead of
+        time, as they're the most likely to be opened next. `0`, the default, for no suggestions, as each suggestion
+        followed is another `/tree` request.
+    QUERY_CACHE_SIZE : int
+        number of validated queries each GET endpoint keeps, so repeated requests skip parsing and validating their
+        query. `0` to validate every request.
+    MONITOR : bool
+        measure how late the event loop runs, and time and sample the stack of each call to a handler, see
+        `jupyter_cassini_server.monitor`. Results are served from `/monitor` and the server's `/metrics` page.
+    MONITOR_PROBE_INTERVAL : float
+        seconds between checks of the event loop's lag.
+    MONITOR_SLOW_CALL_SECONDS : float
+        handler calls, and lags, longer than this are logged. Slow calls are kept along with their stack samples.
+    MONITOR_SAMPLE_INTERVAL : float
+        seconds between samples of the stack of each running handler call.
+    MONITOR_STACK_DEPTH : int
+        number of innermost frames kept from each stack sample.
+    MONITOR_MAX_SLOW_CALLS : int
+        number of the most recent slow calls kept.
+    """
+
+    MAX_META_VALUE_SIZE: Optional[int] = 10_000
+    EXPORT_FLUSH_EVERY: int = 100
+    PARALLEL_MIN_CHILDREN: Optional[int] = None
+    PARALLEL_WORKERS: Optional[int] = None
+    CACHE_SNAPSHOT: bool = False
+    CACHE_SNAPSHOT_FILE: str = ".cas_server_cache.pickle"
+    CACHE_SNAPSHOT_INTERVAL: Optional[float] = 600
+    CHANGES_REFRESH_INTERVAL: float = 10
+    META_WRITE_WORKERS: int = 8
+    AUDIT_CHUNK_SIZE: int = 200
+    AUDIT_PARALLEL: bool = False
+    PREFETCH_HINTS: int = 0
+    QUERY_CACHE_SIZE: int = 1024
+    MONITOR: bool = False
+    MONITOR_PROBE_INTERVAL: float = 0.5
+    MONITOR_SLOW_CALL_SECONDS: float = 0.2
+    MONITOR_SAMPLE_INTERVAL: float = 0.01
+    MONITOR_STACK_DEPTH: int = 30
+    MONITOR_MAX_SLOW_CALLS: int = 50
+
+
+config = Config()
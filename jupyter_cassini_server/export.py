@@ -0,0 +1,91 @@
+from typing import Callable, Iterator, List, Optional, Tuple, Type
+
+from pydantic import ValidationError
+
+from cassini import Project
+from cassini.core import TierABC
+from cassini.meta import MetaValidationError
+
+from .cache import id_sort_key
+from .schema.models import ExportRecord
+from .serialisation import serialize_child
+from .snapshot import DirSnapshot
+
+
+def find_tier_class(project: Project, name: str) -> Type[TierABC]:
+    """
+    Find the tier class in the project's hierarchy with a `pretty_type` or `short_type` of `name` (ignoring case).
+    """
+    for tier_cls in project.hierarchy:
+        if name.lower() in (tier_cls.pretty_type.lower(), tier_cls.short_type.lower()):
+            return tier_cls
+
+    raise ValueError("Unknown tier class", name)
+
+
+def iter_tiers(
+    root: TierABC, descend: Optional[Callable[[TierABC], bool]] = None
+) -> Iterator[Tuple[TierABC, DirSnapshot]]:
+    """
+    Walk down the tree from `root`, depth first, yielding each tier along with a snapshot of its folder's listing.
+
+    Only the children of the tiers on the current path are held, so memory use doesn't grow with the size of the
+    project. Children are visited in order of id.
+
+    Parameters
+    ----------
+    root : TierABC
+        tier to start from, this is yielded first.
+    descend : Callable[[TierABC], bool]
+        only visit the children of tiers for which this is `True`. Defaults to visiting everything.
+    """
+    # each level gets its own snapshot, so siblings share a listing, but listings don't pile up.
+    stack: List[Iterator[TierABC]] = [iter([root])]
+    snapshots: List[DirSnapshot] = [DirSnapshot()]
+
+    while stack:
+        tier = next(stack[-1], None)
+
+        if tier is None:
+            stack.pop()
+            snapshots.pop()
+            continue
+
+        yield tier, snapshots[-1]
+
+        if tier.child_cls and (descend is None or descend(tier)):
+            stack.append(iter(sorted(tier, key=lambda child: id_sort_key(child.id))))
+            snapshots.append(DirSnapshot())
+
+
+def iter_export(root: TierABC, tier_class: Optional[Type[TierABC]] = None) -> Iterator[ExportRecord]:
+    """
+    Walk down the tree from `root` (see `iter_tiers`), yielding an `ExportRecord` for each tier. Tiers whose meta
+    can't be read get a record with just their name and `error`.
+
+    Parameters
+    ----------
+    root : TierABC
+        tier to start from, this is included in the export.
+    tier_class : Type[TierABC]
+        only yield tiers of this class. Tiers below this class in the hierarchy aren't visited.
+    """
+    project = root.project
+    max_rank = project.rank_map[tier_class] if tier_class else None
+
+    def descend(tier: TierABC) -> bool:
+        return max_rank is None or project.rank_map[type(tier)] < max_rank
+
+    for tier, snapshot in iter_tiers(root, descend):
+        if tier_class is None or type(tier) is tier_class:
+            try:
+                # exports are for other systems, which can't fetch placeholders from `/metaValue`.
+                child = serialize_child(tier, snapshot, lazy=False).model_dump()
+            except (MetaValidationError, ValidationError) as e:
+                # one broken meta file shouldn't cut the stream short.
+                yield ExportRecord(
+                    ids=list(tier.identifiers), tierClass=tier.pretty_type, name=tier.name, error=str(e)
+                )
+                continue
+
+            yield ExportRecord(ids=list(tier.identifiers), tierClass=tier.pretty_type, **child)
@@ -1,16 +1,28 @@
-from typing import TypeVar, Callable, Union
+from typing import TypeVar, Callable, Union, Optional
+from pathlib import Path
 import datetime
+import json
 
 from jupyter_server.utils import url_path_join
 from jupyter_server.base.handlers import APIHandler
 
 import tornado
+from tornado.ioloop import IOLoop
+from pydantic import ValidationError
 
 from cassini import env
-from cassini.core import NotebookTierBase
-
-from jupyter_cassini_server.safety import needs_project, with_types
-from jupyter_cassini_server.serialisation import serialize_branch, serialize_child, encode_path
+from cassini.core import NotebookTierBase, TierABC
+
+from jupyter_cassini_server.audit import iter_audit
+from jupyter_cassini_server.cache import tree_cache
+from jupyter_cassini_server.config import config
+from jupyter_cassini_server.export import find_tier_class, iter_export
+from jupyter_cassini_server.highlights import get_highlights_index
+from jupyter_cassini_server.meta_update import MetaUpdateError, MetaWriteError, update_metas
+from jupyter_cassini_server.monitor import monitor
+from jupyter_cassini_server.safety import needs_project, with_types, parse_get_query
+from jupyter_cassini_server.snapshot import DirSnapshot, stamp
+from jupyter_cassini_server.serialisation import serialize_branch, encode_path
 from jupyter_cassini_server.schema.models import (
     NewChildInfo,
     TreePathQuery,
@@ -18,7 +30,24 @@ from jupyter_cassini_server.schema.models import (
     TierInfo,
     MetaSchema,
     LookupGetParametersQuery,
+    LookupBatchRequest,
+    LookupBatchResponse,
+    TierSummary,
+    TierType,
     OpenGetParametersQuery,
+    MetaValueGetParametersQuery,
+    MetaValueResponse,
+    HighlightsIndexGetParametersQuery,
+    HighlightsIndex,
+    ExportGetParametersQuery,
+    AuditGetParametersQuery,
+    Kind,
+    ChangesGetParametersQuery,
+    ChangesResponse,
+    MetaUpdateRequest,
+    MetaUpdateResponse,
+    MonitorGetParametersQuery,
+    MonitorResponse,
     FolderTierInfo,
     NotebookTierInfo,
     Status,
@@ -26,6 +55,44 @@ from jupyter_cassini_server.schema.models import (
 )
 
 
+def lookup_info(tier: TierABC, snapshot: DirSnapshot) -> TierInfo:
+    """
+    Get the info about `tier` sent by `/lookup`, including its children.
+    """
+    assert env.project
+    project = env.project
+
+    children = tree_cache.get(tier, snapshot).materialize()
+
+    if isinstance(tier, NotebookTierBase):
+        started = tier.started.replace(tzinfo=datetime.timezone.utc)
+        raw_hlts_path = tier.highlights_file if tier.highlights_file else None
+
+        if raw_hlts_path and snapshot.exists(raw_hlts_path):
+            hlts_path = encode_path(raw_hlts_path, project)
+        else:
+            hlts_path = None
+
+        return TierInfo(NotebookTierInfo(
+            tierType='notebook',
+            name=tier.name,
+            ids=list(tier.identifiers),
+            notebookPath=encode_path(tier.file, project),
+            metaPath=encode_path(tier.meta_file, project),
+            hltsPath=hlts_path,
+            started=started,
+            children=children,
+            metaSchema=MetaSchema.model_validate(tier.meta_model.model_json_schema())
+        ))
+    else:
+        return TierInfo(FolderTierInfo(
+            tierType='folder',
+            name=tier.name,
+            ids=list(tier.identifiers),
+            children=children
+        ))
+
+
 class LookupHandler(APIHandler):
     # The following decorator should be present on all verb methods (head, get, post,
     # patch, put, delete, options) to ensure only authorized user can request the
@@ -39,37 +106,55 @@ class LookupHandler(APIHandler):
 
         name = query.name
         tier = project[name]
+        snapshot = DirSnapshot()
 
-        if not tier.exists():
+        if not snapshot.tier_exists(tier):
             raise ValueError(name, "not found")
 
-        if isinstance(tier, NotebookTierBase):
-            started = tier.started.replace(tzinfo=datetime.timezone.utc)
-            raw_hlts_path = tier.highlights_file if tier.highlights_file else None
+        info = lookup_info(tier, snapshot)
+        self.log.debug(f"Looked up {name}, {snapshot}")
+        return info
 
-            if raw_hlts_path and raw_hlts_path.exists():
-                hlts_path = encode_path(raw_hlts_path, project)
-            else:
-                hlts_path = None
 
-            return TierInfo(NotebookTierInfo(
-                tierType='notebook',
-                name=tier.name,
-                ids=list(tier.identifiers),
-                notebookPath=encode_path(tier.file, project),
-                metaPath=encode_path(tier.meta_file, project),
-                hltsPath=hlts_path,
-                started=started,
-                children={child.id: serialize_child(child) for child in tier},
-                metaSchema=MetaSchema.model_validate(tier.meta_model.model_json_schema())
-            ))
-        else:
-            return TierInfo(FolderTierInfo(
-                tierType='folder',
-                name=tier.name,
+class LookupBatchHandler(APIHandler):
+    """
+    Looks up many tiers at once, without reading their children unless their full info is asked for.
+    """
+
+    @tornado.web.authenticated
+    @needs_project
+    @with_types(LookupBatchRequest, LookupBatchResponse, "POST")
+    def post(self, query: LookupBatchRequest) -> LookupBatchResponse:
+        assert env.project
+        project = env.project
+
+        snapshot = DirSnapshot()
+        tiers = {}
+        infos = {}
+        missing = []
+
+        for name in dict.fromkeys(query.names):
+            try:
+                tier = project[name]
+            except ValueError:
+                missing.append(name)
+                continue
+
+            if not snapshot.tier_exists(tier):
+                missing.append(name)
+                continue
+
+            tiers[name] = TierSummary(
                 ids=list(tier.identifiers),
-                children={child.id: serialize_child(child) for child in tier}
-            ))
+                tierType=TierType.notebook if isinstance(tier, NotebookTierBase) else TierType.folder,
+            )
+
+            if query.info:
+                infos[name] = lookup_info(tier, snapshot)
+
+        self.log.debug(f"Looked up {len(tiers)} tiers, {len(missing)} missing, {snapshot}")
+
+        return LookupBatchResponse(tiers=tiers, infos=infos if query.info else None, missing=missing)
 
 
 class OpenHandler(APIHandler):
@@ -92,6 +177,181 @@ class OpenHandler(APIHandler):
             return Status(status=Status1.failure)
 
 
+class MetaValueHandler(APIHandler):
+
+    @tornado.web.authenticated
+    @needs_project
+    @with_types(MetaValueGetParametersQuery, MetaValueResponse, "GET")
+    def get(self, query: MetaValueGetParametersQuery) -> MetaValueResponse:
+        assert env.project
+
+        tier = env.project[query.name]
+
+        if not isinstance(tier, NotebookTierBase) or not tier.exists():
+            raise ValueError("Tier has no meta", query.name)
+
+        if query.key not in tier.meta.keys():
+            raise ValueError("Meta key not found", query.name, query.key)
+
+        return MetaValueResponse(name=tier.name, key=query.key, value=tier.meta[query.key])
+
+
+def get_highlights_file(name: str) -> Path:
+    assert env.project
+
+    tier = env.project[name]
+
+    if not isinstance(tier, NotebookTierBase) or not tier.highlights_file or not tier.highlights_file.exists():
+        raise ValueError("Tier has no highlights", name)
+    
+    return tier.highlights_file
+
+
+class HighlightsHandler(APIHandler, tornado.web.StaticFileHandler):
+    """
+    Streams highlights files in chunks. `StaticFileHandler` takes care of range and conditional requests.
+    """
+
+    def initialize(self) -> None:
+        tornado.web.StaticFileHandler.initialize(self, path="")
+
+    @tornado.web.authenticated
+    @needs_project
+    async def get(self, include_body: bool = True) -> None:
+        assert env.project
+
+        name = self.get_argument("name")
+
+        try:
+            hlts_file = get_highlights_file(name)
+        except ValueError as e:
+            raise tornado.web.HTTPError(404, reason=e.__class__.__name__, log_message=f'No highlights for {name}, {e}')
+
+        self.root = env.project.project_folder.as_posix()
+        await tornado.web.StaticFileHandler.get(self, encode_path(hlts_file, env.project), include_body)
+
+    async def head(self) -> None:
+        # `StaticFileHandler.head` expects the path as an argument, which this handler gets from the query instead.
+        await self.get(include_body=False)
+
+    def get_content_type(self) -> str:
+        # highlights files are JSON, whatever their extension.
+        return "application/json"
+
+    def compute_etag(self) -> Optional[str]:
+        # the default hashes the whole file, the mtime and size are enough.
+        assert self.absolute_path
+        mtime, size = stamp(Path(self.absolute_path))
+        return f'"{mtime:x}-{size:x}"'
+
+    def set_extra_headers(self, path: str) -> None:
+        # make browsers revalidate, which is cheap thanks to the etag.
+        self.set_header("Cache-Control", "no-cache")
+
+
+class HighlightsIndexHandler(APIHandler):
+
+    @tornado.web.authenticated
+    @needs_project
+    @with_types(HighlightsIndexGetParametersQuery, HighlightsIndex, "GET")
+    def get(self, query: HighlightsIndexGetParametersQuery) -> HighlightsIndex:
+        assert env.project
+
+        hlts_file = get_highlights_file(query.name)
+
+        try:
+            entries = get_highlights_index(hlts_file)
+        except ValueError as e:
+            # the file is there, so this isn't a 404.
+            raise tornado.web.HTTPError(
+                500, reason=e.__class__.__name__, log_message=f'Corrupt highlights file for {query.name}, {e}'
+            )
+
+        return HighlightsIndex(
+            name=query.name,
+            hltsPath=encode_path(hlts_file, env.project),
+            size=hlts_file.stat().st_size,
+            entries=entries
+        )
+
+
+class ExportHandler(APIHandler):
+    """
+    Streams the tree as newline delimited JSON. Records are written as they're generated, flushing every
+    `config.EXPORT_FLUSH_EVERY` records.
+    """
+
+    @tornado.web.authenticated
+    @needs_project
+    async def get(self) -> None:
+        assert env.project
+        project = env.project
+
+        try:
+            query = ExportGetParametersQuery.model_validate(parse_get_query(self.request.query))
+        except ValidationError as e:
+            raise tornado.web.HTTPError(400, reason=e.__class__.__name__, log_message=f'Invalid Query, {e}')
+
+        try:
+            root = project[query.root] if query.root else project.home
+            tier_class = find_tier_class(project, query.tierClass) if query.tierClass else None
+        except ValueError as e:
+            raise tornado.web.HTTPError(404, reason=e.__class__.__name__, log_message=f'Value error from query {query}, {e}')
+
+        if not root.exists():
+            raise tornado.web.HTTPError(404, reason="ValueError", log_message=f'Tier does not exist {root.name}')
+
+        self.set_header("Content-Type", "application/x-ndjson")
+
+        for i, record in enumerate(iter_export(root, tier_class), start=1):
+            self.write(record.model_dump_json(by_alias=True, exclude_defaults=True) + "\n")
+
+            if i % config.EXPORT_FLUSH_EVERY == 0:
+                await self.flush()
+
+        await self.finish(set_content_type="application/x-ndjson")
+
+
+class AuditHandler(APIHandler):
+    """
+    Streams the records of an audit of the project's meta files as newline delimited JSON, flushing after every
+    `progress` record. The audit runs in a thread, so other requests can be served meanwhile.
+    """
+
+    @tornado.web.authenticated
+    @needs_project
+    async def get(self) -> None:
+        assert env.project
+        project = env.project
+
+        try:
+            query = AuditGetParametersQuery.model_validate(parse_get_query(self.request.query))
+        except ValidationError as e:
+            raise tornado.web.HTTPError(400, reason=e.__class__.__name__, log_message=f'Invalid Query, {e}')
+
+        try:
+            root = project[query.root] if query.root else project.home
+            after = project[query.after] if query.after else None
+        except ValueError as e:
+            raise tornado.web.HTTPError(404, reason=e.__class__.__name__, log_message=f'Value error from query {query}, {e}')
+
+        if not root.exists():
+            raise tornado.web.HTTPError(404, reason="ValueError", log_message=f'Tier does not exist {root.name}')
+
+        self.set_header("Content-Type", "application/x-ndjson")
+
+        records = iter_audit(root, after)
+        loop = IOLoop.current()
+
+        while (record := await loop.run_in_executor(None, next, records, None)) is not None:
+            self.write(record.model_dump_json(exclude_none=True) + "\n")
+
+            if record.kind is not Kind.failure:
+                await self.flush()
+
+        await self.finish(set_content_type="application/x-ndjson")
+
+
 class NewChildHandler(APIHandler):
 
     @tornado.web.authenticated
@@ -122,10 +382,31 @@ class NewChildHandler(APIHandler):
             template = None
 
         child.setup_files(template, meta=meta)
+        tree_cache.invalidate(parent)
 
         return serialize_branch(child)
 
 
+class UpdateMetaHandler(APIHandler):
+
+    @tornado.web.authenticated
+    @needs_project
+    @with_types(MetaUpdateRequest, MetaUpdateResponse, "POST")
+    def post(self, query: MetaUpdateRequest) -> MetaUpdateResponse:
+        assert env.project
+
+        try:
+            updated = update_metas(env.project, query.updates)
+        except MetaUpdateError as e:
+            raise tornado.web.HTTPError(400, reason="MetaUpdateError", log_message=json.dumps(e.errors))
+        except MetaWriteError as e:
+            raise tornado.web.HTTPError(500, reason="MetaWriteError", log_message=json.dumps(e.errors))
+
+        self.log.debug(f"Updated meta of {len(updated)} tiers")
+
+        return MetaUpdateResponse(updated=updated, generation=tree_cache.generation)
+
+
 class TreeHandler(APIHandler):
 
     @tornado.web.authenticated
@@ -139,17 +420,76 @@ class TreeHandler(APIHandler):
         try:
             tier = env.project.home
 
-            while ids:
-                id_ = ids.pop(0)
+            # queries may be shared between requests (see `with_types`), so ids isn't consumed.
+            for id_ in ids:
                 tier = tier[id_]
 
         except ValueError:
             raise ValueError("Invalid tier name", ids)
 
-        if not tier.exists():
+        snapshot = DirSnapshot()
+
+        if not snapshot.tier_exists(tier):
             raise ValueError("Tier does not exist", ids)
 
-        return serialize_branch(tier)
+        branch = tree_cache.get(tier, snapshot)
+
+        if query.sort or query.filter or query.limit is not None or query.offset:
+            try:
+                selected = branch.select(sort=query.sort, filter=query.filter)
+            except ValueError as e:
+                # a bad field is a bad query, not a missing tier.
+                raise tornado.web.HTTPError(
+                    400, reason=e.__class__.__name__, log_message=f'Invalid sort or filter, {e}'
+                )
+
+            start = query.offset or 0
+            stop = None if query.limit is None else start + query.limit
+            page = selected[start:stop]
+        else:
+            selected = None
+            page = None
+
+        response = serialize_branch(tier, branch.materialize(page), snapshot, child_meta_keys=branch.meta_keys())
+        self.log.debug(f"Served tree of {tier.name}, {snapshot}")
+
+        if selected is not None:
+            response.childCount = len(selected)
+
+            if query.sort:
+                response.childOrder = page
+
+        if config.PREFETCH_HINTS:
+            recent = branch.most_recent(config.PREFETCH_HINTS)
+
+            # only worth fetching ahead if the children have children of their own.
+            if recent and tier[recent[0]].child_cls:
+                response.prefetch = recent
+
+        return response
+
+
+class ChangesHandler(APIHandler):
+
+    @tornado.web.authenticated
+    @needs_project
+    @with_types(ChangesGetParametersQuery, ChangesResponse, "GET")
+    def get(self, query: ChangesGetParametersQuery) -> ChangesResponse:
+        tree_cache.refresh(config.CHANGES_REFRESH_INTERVAL)
+
+        return ChangesResponse(
+            epoch=tree_cache.epoch,
+            generation=tree_cache.generation,
+            changed={} if query.since is None else tree_cache.changes(query.since),
+        )
+
+
+class MonitorHandler(APIHandler):
+
+    @tornado.web.authenticated
+    @with_types(MonitorGetParametersQuery, MonitorResponse, "GET")
+    def get(self, query: MonitorGetParametersQuery) -> MonitorResponse:
+        return monitor.report(clear=bool(query.clear))
 
 
 def setup_handlers(web_app):
@@ -157,14 +497,32 @@ def setup_handlers(web_app):
 
     base_url = web_app.settings["base_url"]
     lookup_pattern = url_path_join(base_url, "jupyter_cassini", "lookup")
+    lookup_batch_pattern = url_path_join(base_url, "jupyter_cassini", "lookupBatch")
     tree_pattern = url_path_join(base_url, "jupyter_cassini", r"tree(?P<path>(?:(?:/[^/]+)+|/?))")
     open_pattern = url_path_join(base_url, "jupyter_cassini", "open")
     new_child_pattern = url_path_join(base_url, "jupyter_cassini", "newChild")
+    meta_value_pattern = url_path_join(base_url, "jupyter_cassini", "metaValue")
+    highlights_pattern = url_path_join(base_url, "jupyter_cassini", "highlights")
+    highlights_index_pattern = url_path_join(base_url, "jupyter_cassini", "highlightsIndex")
+    export_pattern = url_path_join(base_url, "jupyter_cassini", "export")
+    changes_pattern = url_path_join(base_url, "jupyter_cassini", "changes")
+    audit_pattern = url_path_join(base_url, "jupyter_cassini", "audit")
+    update_meta_pattern = url_path_join(base_url, "jupyter_cassini", "updateMeta")
+    monitor_pattern = url_path_join(base_url, "jupyter_cassini", "monitor")
 
     handlers = [
         (lookup_pattern, LookupHandler),
+        (lookup_batch_pattern, LookupBatchHandler),
         (tree_pattern, TreeHandler),
         (open_pattern, OpenHandler),
         (new_child_pattern, NewChildHandler),
+        (meta_value_pattern, MetaValueHandler),
+        (highlights_pattern, HighlightsHandler),
+        (highlights_index_pattern, HighlightsIndexHandler),
+        (export_pattern, ExportHandler),
+        (changes_pattern, ChangesHandler),
+        (audit_pattern, AuditHandler),
+        (update_meta_pattern, UpdateMetaHandler),
+        (monitor_pattern, MonitorHandler),
     ]
     web_app.add_handlers(host_pattern, handlers)
@@ -0,0 +1,90 @@
+import json
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from cassini import env
+
+from .schema.models import HighlightEntry
+from .snapshot import Stamp, stamp
+
+
+_WHITESPACE = " \t\n\r"
+_decoder = json.JSONDecoder()
+_index_cache: Dict[str, Tuple[Stamp, List[HighlightEntry]]] = env.create_cache()
+
+
+def _skip(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos] in _WHITESPACE:
+        pos += 1
+    return pos
+
+
+def _expect(text: str, pos: int, char: str) -> int:
+    pos = _skip(text, pos)
+    if text[pos:pos + 1] != char:
+        raise ValueError(f"Invalid highlights file, expected {char!r} at {pos}")
+    return pos + 1
+
+
+def parse_highlights_index(text: str) -> List[HighlightEntry]:
+    """
+    Find the byte range of each highlight in the contents of a highlights file, along with its mime types.
+
+    The file is an object of `title: outputs` pairs. `start` and `end` give the byte range of the outputs of each title
+    in the utf-8 encoded file. The `outputs` can be parsed alone.
+    """
+    entries = []
+    pos = _expect(text, 0, "{")
+    byte_pos = 0
+    char_pos = 0
+
+    def to_bytes(pos: int) -> int:
+        nonlocal byte_pos, char_pos
+        byte_pos += len(text[char_pos:pos].encode("utf-8"))
+        char_pos = pos
+        return byte_pos
+
+    pos = _skip(text, pos)
+
+    if text[pos:pos + 1] == "}":
+        return entries
+
+    while True:
+        title, pos = _decoder.raw_decode(text, _skip(text, pos))
+        pos = _skip(text, _expect(text, pos, ":"))
+
+        start = to_bytes(pos)
+        outputs, pos = _decoder.raw_decode(text, pos)
+        end = to_bytes(pos)
+
+        mime_types: List[str] = []
+
+        for output in outputs:
+            for mime_type in output.get("data", {}):
+                if mime_type not in mime_types:
+                    mime_types.append(mime_type)
+
+        entries.append(HighlightEntry(title=title, start=start, end=end, mimeTypes=mime_types))
+
+        pos = _skip(text, pos)
+
+        if text[pos:pos + 1] == "}":
+            return entries
+
+        pos = _expect(text, pos, ",")
+
+
+def get_highlights_index(path: Path) -> List[HighlightEntry]:
+    """
+    Get the index of the highlights file at `path`. These are cached until the file changes.
+    """
+    key = path.as_posix()
+    current = stamp(path)
+    cached = _index_cache.get(key)
+
+    if cached and cached[0] == current:
+        return cached[1]
+
+    entries = parse_highlights_index(path.read_text(encoding="utf-8"))
+    _index_cache[key] = (current, entries)
+    return entries
@@ -0,0 +1,178 @@
+"""
+Updating the meta of many tiers at once.
+
+All updates are validated before anything is written, so a bad update means nothing changes. Files are then written
+concurrently, each to a temporary file that's renamed over the meta file, so readers never see a half written file.
+If some files can't be written, the others still are, and only the failures are reported.
+"""
+import json
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, ValidationError
+
+from cassini import Project
+from cassini.core import NotebookTierBase, TierABC
+
+from .cache import tree_cache
+from .config import config
+from .schema.models import MetaUpdate
+from .snapshot import DirSnapshot
+
+
+class MetaUpdateError(Exception):
+    """
+    Raised when updates fail validation, before anything is written.
+
+    Attributes
+    ----------
+    errors : Dict[str, str]
+        name of each tier whose update was invalid -> why.
+    """
+
+    def __init__(self, errors: Dict[str, str]) -> None:
+        super().__init__(f"Invalid meta updates for {', '.join(errors)}")
+        self.errors = errors
+
+
+class MetaWriteError(Exception):
+    """
+    Raised when some valid updates couldn't be written. Every other update was written.
+
+    Attributes
+    ----------
+    errors : Dict[str, str]
+        name of each tier whose meta file couldn't be written -> why.
+    """
+
+    def __init__(self, errors: Dict[str, str]) -> None:
+        super().__init__(f"Couldn't write meta for {', '.join(errors)}")
+        self.errors = errors
+
+
+def validate_updates(project: Project, updates: List[MetaUpdate]) -> List[Tuple[NotebookTierBase, BaseModel]]:
+    """
+    Apply each update to the current meta of its tier and validate the result against the tier's `meta_model`.
+
+    Updates start from the contents of the meta file rather than its validated meta, so a file that no longer
+    validates can be fixed. Several updates to the same tier are applied in turn.
+
+    Returns each tier along with its new meta. Raises `MetaUpdateError` listing every invalid update.
+    """
+    by_name: Dict[str, List[MetaUpdate]] = {}
+
+    for update in updates:
+        by_name.setdefault(update.name, []).append(update)
+
+    validated = []
+    errors: Dict[str, str] = {}
+
+    for name, tier_updates in by_name.items():
+        try:
+            tier = project[name]
+        except ValueError as e:
+            errors[name] = str(e)
+            continue
+
+        if not isinstance(tier, NotebookTierBase):
+            errors[name] = "Tier has no meta"
+            continue
+
+        if not tier.meta_file.exists():
+            errors[name] = "Tier does not exist"
+            continue
+
+        try:
+            data = json.loads(tier.meta_file.read_text(encoding="utf-8"))
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            errors[name] = f"Unreadable meta file: {e}"
+            continue
+
+        if not isinstance(data, dict):
+            errors[name] = "Unreadable meta file: not a JSON object"
+            continue
+
+        for update in tier_updates:
+            data.update(update.set or {})
+
+            for key in update.unset or []:
+                data.pop(key, None)
+
+        try:
+            validated.append((tier, tier.meta_model.model_validate(data, strict=False)))
+        except ValidationError as e:
+            errors[name] = str(e)
+
+    if errors:
+        raise MetaUpdateError(errors)
+
+    return validated
+
+
+def write_atomic(path: Path, text: str) -> None:
+    """
+    Write `text` to `path` via a temporary file in the same folder, which is then renamed over `path`.
+    """
+    temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+def update_metas(project: Project, updates: List[MetaUpdate]) -> List[str]:
+    """
+    Validate then write `updates`, bring the tree cache up to date with them and record them as changed.
+
+    Returns the names of the updated tiers. If some files can't be written, the rest still are, and are recorded as
+    changed, then `MetaWriteError` is raised listing the ones that failed.
+    """
+    validated = validate_updates(project, updates)
+
+    def write(item: Tuple[NotebookTierBase, BaseModel]) -> Optional[str]:
+        tier, meta = item
+
+        try:
+            # matches `cassini.meta.Meta.write`
+            write_atomic(tier.meta_file, meta.model_dump_json(exclude_defaults=True, exclude={"__pydantic_extra__"}))
+        except OSError as e:
+            return str(e)
+
+        return None
+
+    with ThreadPoolExecutor(max_workers=config.META_WRITE_WORKERS) as pool:
+        results = list(pool.map(write, validated))
+
+    written = [tier for (tier, _), error in zip(validated, results) if error is None]
+    errors = {tier.name: error for (tier, _), error in zip(validated, results) if error is not None}
+
+    parents: Dict[str, TierABC] = {}
+
+    for tier in written:
+        tier.meta.fetch()
+
+        if tier.parent is not None:
+            parents[tier.parent.name] = tier.parent
+
+    snapshot = DirSnapshot()
+
+    for parent in parents.values():
+        if parent.folder.as_posix() in tree_cache.branches:
+            tree_cache.get(parent, snapshot)
+
+    names = [tier.name for tier in written]
+
+    if names:
+        tree_cache.bump(*names, *parents)
+
+    if errors:
+        raise MetaWriteError(errors)
+
+    return names
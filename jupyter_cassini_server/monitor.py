@@ -0,0 +1,237 @@
+"""
+Finding what blocks the server's event loop.
+
+Everything the extension does runs on the event loop unless it's handed to a thread or the worker pool, so a slow
+handler stalls every other request, including those of JupyterLab itself. When `config.MONITOR` is on:
+
+* a probe is scheduled on the loop every `MONITOR_PROBE_INTERVAL`, how late it runs is the loop's lag.
+* each call to a handler (see `with_types`) is timed, and while it runs a thread samples the loop thread's stack.
+* calls slower than `MONITOR_SLOW_CALL_SECONDS` are logged, and kept along with their most common stacks.
+
+The lag and call durations are Prometheus metrics, so appear on the server's `/metrics` page. Slow calls can be
+fetched from the `/monitor` endpoint.
+"""
+import datetime
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional, Tuple
+
+from prometheus_client import Counter as CounterMetric, Gauge, Histogram
+from tornado.ioloop import IOLoop
+
+from .config import config
+from .schema.models import MonitorResponse, SlowCall, StackSample
+
+
+EVENT_LOOP_LAG = Gauge(
+    "cassini_event_loop_lag_seconds",
+    "Seconds the event loop was late running the last lag probe",
+)
+HANDLER_BLOCKING = Histogram(
+    "cassini_handler_blocking_seconds",
+    "Seconds each call to a cassini handler blocked the event loop for",
+    ["endpoint"],
+)
+SLOW_CALLS = CounterMetric(
+    "cassini_slow_calls_total",
+    "Number of calls to a cassini handler that blocked the event loop for longer than the slow call threshold",
+    ["endpoint"],
+)
+
+# most common stacks kept for each slow call.
+TOP_STACKS = 5
+
+
+class _ActiveCall:
+    """
+    A handler call in progress, and the stacks it's been sampled at.
+    """
+
+    __slots__ = ("endpoint", "query", "thread_id", "started", "start", "samples")
+
+    def __init__(self, endpoint: str, query: str) -> None:
+        self.endpoint = endpoint
+        self.query = query
+        self.thread_id = threading.get_ident()
+        self.started = datetime.datetime.now(datetime.timezone.utc)
+        self.start = time.perf_counter()
+        self.samples: Counter[Tuple[str, ...]] = Counter()
+
+
+class Monitor:
+    """
+    Measures the event loop's lag and times handler calls, see module docstring.
+
+    Attributes
+    ----------
+    enabled : bool
+        whether `start` has been called, calls aren't timed otherwise.
+    lag : float
+        seconds the last probe ran late by.
+    max_lag : float
+        most seconds a probe has run late by since `start`.
+    slow_calls : Deque[SlowCall]
+        the most recent slow calls, at most `config.MONITOR_MAX_SLOW_CALLS`.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.lag = 0.0
+        self.max_lag = 0.0
+        self.slow_calls: Deque[SlowCall] = deque(maxlen=config.MONITOR_MAX_SLOW_CALLS)
+        self.log = logging.getLogger(__name__)
+
+        self._active: Dict[int, _ActiveCall] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._loop: Optional[IOLoop] = None
+        self._probe_handle: object = None
+        self._next_probe = 0.0
+
+    def start(self, log: Optional[logging.Logger] = None) -> None:
+        """
+        Start probing the current event loop, and timing and sampling handler calls. Slow calls are logged to `log`.
+        """
+        if self.enabled:
+            return
+
+        if log is not None:
+            self.log = log
+
+        self.enabled = True
+        self.lag = self.max_lag = 0.0
+        self.slow_calls = deque(maxlen=config.MONITOR_MAX_SLOW_CALLS)
+
+        self._loop = IOLoop.current()
+        self._schedule_probe()
+
+        self._stopping.clear()
+        self._sampler = threading.Thread(target=self._sample, name="cassini-monitor", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> None:
+        if not self.enabled:
+            return
+
+        self.enabled = False
+
+        if self._loop and self._probe_handle:
+            self._loop.remove_timeout(self._probe_handle)
+
+        self._loop = self._probe_handle = None
+
+        self._stopping.set()
+
+        if self._sampler:
+            self._sampler.join()
+            self._sampler = None
+
+    def _schedule_probe(self) -> None:
+        assert self._loop
+        self._next_probe = time.perf_counter() + config.MONITOR_PROBE_INTERVAL
+        self._probe_handle = self._loop.call_later(config.MONITOR_PROBE_INTERVAL, self._probe)
+
+    def _probe(self) -> None:
+        lag = max(0.0, time.perf_counter() - self._next_probe)
+
+        self.lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        EVENT_LOOP_LAG.set(lag)
+
+        if lag >= config.MONITOR_SLOW_CALL_SECONDS:
+            self.log.warning(f"Cassini: event loop was blocked for {lag:.3f}s")
+
+        if self.enabled:
+            self._schedule_probe()
+
+    def _sample(self) -> None:
+        # runs in its own thread, recording the stack each active call is at.
+        while not self._stopping.wait(config.MONITOR_SAMPLE_INTERVAL):
+            with self._lock:
+                if not self._active:
+                    continue
+
+                frames = sys._current_frames()
+
+                for call in self._active.values():
+                    frame = frames.get(call.thread_id)
+
+                    if frame is None:
+                        continue
+
+                    stack = traceback.extract_stack(frame, limit=config.MONITOR_STACK_DEPTH)
+                    call.samples[tuple(f"{entry.filename}:{entry.lineno} in {entry.name}" for entry in stack)] += 1
+
+                # frames keep their locals alive.
+                del frames
+
+    @contextmanager
+    def track(self, endpoint: str, query: str) -> Iterator[None]:
+        """
+        Time the block as a call to `endpoint` with `query`, sampling its stack while it runs.
+
+        Does nothing if the monitor isn't running.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        call = _ActiveCall(endpoint, query)
+
+        with self._lock:
+            self._active[id(call)] = call
+
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - call.start
+
+            with self._lock:
+                del self._active[id(call)]
+
+            HANDLER_BLOCKING.labels(endpoint).observe(duration)
+
+            if duration >= config.MONITOR_SLOW_CALL_SECONDS:
+                self._record_slow_call(call, duration)
+
+    def _record_slow_call(self, call: _ActiveCall, duration: float) -> None:
+        slow_call = SlowCall(
+            endpoint=call.endpoint,
+            query=call.query,
+            started=call.started,
+            duration=duration,
+            samples=[
+                StackSample(frames=list(frames), count=count) for frames, count in call.samples.most_common(TOP_STACKS)
+            ],
+        )
+        self.slow_calls.append(slow_call)
+        SLOW_CALLS.labels(call.endpoint).inc()
+
+        message = f"Cassini: {call.endpoint}?{call.query} blocked the event loop for {duration:.3f}s"
+
+        if slow_call.samples:
+            message += ", most often at:\n    " + "\n    ".join(slow_call.samples[0].frames)
+
+        self.log.warning(message)
+
+    def report(self, clear: bool = False) -> MonitorResponse:
+        """
+        The current state of the monitor. `clear` forgets the slow calls recorded so far.
+        """
+        response = MonitorResponse(
+            enabled=self.enabled, lag=self.lag, maxLag=self.max_lag, slowCalls=list(self.slow_calls)
+        )
+
+        if clear:
+            self.slow_calls.clear()
+
+        return response
+
+
+monitor = Monitor()
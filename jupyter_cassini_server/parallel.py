@@ -0,0 +1,186 @@
+"""
+Serialising the children of large branches across a pool of worker processes.
+
+Workers load their own copy of the project by running the project file, then serialise a chunk of children each. Each
+chunk is sent back as a single JSON string, which is much cheaper to pickle than the models themselves.
+"""
+import json
+import math
+import multiprocessing
+import os
+import runpy
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pydantic import TypeAdapter
+
+from cassini import env
+from cassini.core import NotebookTierBase, TierABC
+
+from .config import config
+from .schema.models import TreeChildResponse
+from .serialisation import serialize_child
+from .snapshot import DirSnapshot
+
+
+_children_adapter = TypeAdapter(Dict[str, TreeChildResponse])
+_project_files: Dict[str, Optional[str]] = env.create_cache()
+_pool: Optional[ProcessPoolExecutor] = None
+
+# worker state
+_worker_project_file: Optional[str] = None
+
+
+def find_project_file(project) -> Optional[str]:
+    """
+    Find the file that defines `project`, so workers can create their own copy. `None` if it can't be found.
+
+    This is the module within the project folder that holds `project`, e.g. `cas_project.py`.
+    """
+    folder = project.project_folder.as_posix()
+
+    if folder in _project_files:
+        return _project_files[folder]
+
+    found = None
+
+    for module in list(sys.modules.values()):
+        file = getattr(module, "__file__", None)
+
+        if not file or not Path(os.path.abspath(file)).as_posix().startswith(folder):
+            continue
+
+        if any(value is project for value in list(vars(module).values())):
+            found = os.path.abspath(file)
+            break
+
+    _project_files[folder] = found
+    return found
+
+
+def _load_project(project_file: str):
+    global _worker_project_file
+
+    if env.project is None or _worker_project_file != project_file:
+        env._reset()
+        runpy.run_path(project_file, run_name="cas_project")
+        _worker_project_file = project_file
+
+    return env.project
+
+
+def _serialize_chunk(project_file: str, parent_name: str, ids: List[str]) -> Optional[str]:
+    """
+    Runs in a worker. Serialise the children of `parent_name` with `ids` into one JSON object of `id: child`.
+
+    Returns `None` if anything goes wrong, so the parent can redo the chunk itself and raise the error properly.
+    """
+    try:
+        parent = _load_project(project_file)[parent_name]
+        parts = []
+
+        for id_ in ids:
+            child = parent[id_]
+
+            if isinstance(child, NotebookTierBase):
+                child.meta.fetch()
+
+            record = serialize_child(child).model_dump_json(by_alias=True, exclude_defaults=True)
+            parts.append(f"{json.dumps(id_)}:{record}")
+
+        return "{" + ",".join(parts) + "}"
+    except Exception:
+        return None
+
+
+def worker_count() -> int:
+    return config.PARALLEL_WORKERS or os.cpu_count() or 1
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """
+    Get the worker pool, starting it if needed.
+
+    Workers are spawned rather than forked, as forking the server process with its threads isn't safe.
+    """
+    global _pool
+
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=worker_count(), mp_context=multiprocessing.get_context("spawn"))
+
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+
+
+def serialize_children_parallel(parent: TierABC, children: List[TierABC]) -> Optional[Dict[str, TreeChildResponse]]:
+    """
+    Serialise `children` of `parent` using the worker pool.
+
+    Returns `None` if the project file can't be found, in which case the children should be serialised serially.
+    """
+    project_file = find_project_file(parent.project)
+
+    if project_file is None:
+        return None
+
+    pool = get_pool()
+    # a few chunks per worker, so a slow chunk doesn't hold everything up.
+    chunk_size = math.ceil(len(children) / (worker_count() * 4))
+    chunks = [children[i:i + chunk_size] for i in range(0, len(children), chunk_size)]
+    futures = [
+        pool.submit(_serialize_chunk, project_file, parent.name, [child.id for child in chunk]) for chunk in chunks
+    ]
+
+    serialized: Dict[str, TreeChildResponse] = {}
+
+    for chunk, future in zip(chunks, futures):
+        result = future.result()
+
+        if result is None:
+            serialized.update(serialize_children_serial(chunk))
+        else:
+            serialized.update(_children_adapter.validate_json(result))
+
+    return serialized
+
+
+def serialize_children_serial(
+    children: List[TierABC], snapshot: Optional[DirSnapshot] = None
+) -> Dict[str, TreeChildResponse]:
+    serialized = {}
+
+    for child in children:
+        if isinstance(child, NotebookTierBase):
+            child.meta.fetch()
+        serialized[child.id] = serialize_child(child, snapshot)
+
+    return serialized
+
+
+def serialize_children(
+    parent: TierABC, children: List[TierABC], snapshot: Optional[DirSnapshot] = None
+) -> Dict[str, TreeChildResponse]:
+    """
+    Serialise `children` of `parent` with fresh meta, by id.
+
+    If there are at least `config.PARALLEL_MIN_CHILDREN`, they're split across the worker pool, otherwise they're
+    serialised in this process. With only one worker, there's nothing to gain, so they're always serialised here.
+    """
+    threshold = config.PARALLEL_MIN_CHILDREN
+
+    if threshold is not None and len(children) >= threshold and worker_count() > 1:
+        serialized = serialize_children_parallel(parent, children)
+
+        if serialized is not None:
+            return serialized
+
+    return serialize_children_serial(children, snapshot)
@@ -0,0 +1,165 @@
+"""
+Saving the server's caches to a file in the project folder, so they survive restarts.
+
+Cached children are checked against the stamps of their meta files and the folder listing the first time each branch
+is requested, and highlights indexes against the stamp of their file, just as they would be in a running server, so only
+what changed while the server was down is recomputed.
+
+The file is a pickle, and loading a pickle can run arbitrary code, so the file must be as trusted as the project file
+that sits next to it.
+"""
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from cassini import Project
+from tornado.ioloop import IOLoop
+
+from .cache import BranchCache, intern_keys, tree_cache
+from .config import config
+from .highlights import _index_cache
+
+
+FORMAT_VERSION = 2
+
+log = logging.getLogger(__name__)
+
+# what was last saved, so unchanged caches aren't written again.
+_last_saved: Optional[Tuple[Any, ...]] = None
+
+
+def snapshot_file(project: Project) -> Path:
+    return project.project_folder / config.CACHE_SNAPSHOT_FILE
+
+
+def _relative(key: str, project: Project) -> Optional[str]:
+    try:
+        return Path(key).relative_to(project.project_folder).as_posix()
+    except ValueError:
+        return None
+
+
+def _fingerprint() -> Tuple[Any, ...]:
+    # any change to a cached branch bumps the generation, and each highlights index is only replaced if its stamp
+    # changes.
+    return (
+        tuple(tree_cache.branches),
+        tree_cache.generation,
+        tuple((key, stamp) for key, (stamp, _) in _index_cache.items()),
+    )
+
+
+def _collect(project: Project) -> Optional[Tuple[Tuple[Any, ...], Dict[str, Any]]]:
+    """
+    Get the fingerprint of the caches, and the data to save, or `None` if nothing has changed since the last save.
+
+    The dicts are copied, so the data can be pickled in another thread while the caches carry on changing.
+    """
+    fingerprint = _fingerprint()
+
+    if fingerprint == _last_saved:
+        return None
+
+    branches: Dict[str, BranchCache] = {}
+    highlights: Dict[str, Any] = {}
+
+    for key, branch in tree_cache.branches.items():
+        if (relative := _relative(key, project)) is not None:
+            branches[relative] = branch
+
+    for key, entry in _index_cache.items():
+        if (relative := _relative(key, project)) is not None:
+            highlights[relative] = entry
+
+    return fingerprint, {"version": FORMAT_VERSION, "branches": branches, "highlights": highlights}
+
+
+def _write(project: Project, data: Dict[str, Any]) -> None:
+    path = snapshot_file(project)
+    temp_path = path.with_name(path.name + ".tmp")
+
+    with open(temp_path, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    os.replace(temp_path, path)
+
+
+def save_caches(project: Project) -> bool:
+    """
+    Write the tree and highlights index caches to the snapshot file of `project`.
+
+    The file is written to a temporary file first, then moved into place, so a crash mid-write can't leave a
+    half written snapshot. Returns `False` if nothing has changed since the last save, so nothing was written.
+    """
+    global _last_saved
+
+    collected = _collect(project)
+
+    if collected is None:
+        return False
+
+    fingerprint, data = collected
+    _write(project, data)
+
+    _last_saved = fingerprint
+    return True
+
+
+async def save_caches_in_background(project: Project) -> bool:
+    """
+    As `save_caches`, but pickles and writes the caches in a thread, so the event loop isn't blocked while it does.
+    """
+    global _last_saved
+
+    collected = _collect(project)
+
+    if collected is None:
+        return False
+
+    fingerprint, data = collected
+    await IOLoop.current().run_in_executor(None, _write, project, data)
+
+    _last_saved = fingerprint
+    return True
+
+
+def load_caches(project: Project) -> int:
+    """
+    Fill the tree and highlights index caches from the snapshot file of `project`, if there is one.
+
+    An unreadable or out of date file is ignored, with a warning. Returns the number of branches loaded.
+    """
+    global _last_saved
+
+    path = snapshot_file(project)
+
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+    except FileNotFoundError:
+        return 0
+    except Exception as e:
+        # e.g. written by a version of this extension with different classes.
+        log.warning(f"Ignoring unreadable cache snapshot {path}, {e!r}")
+        return 0
+
+    if not isinstance(data, dict) or data.get("version") != FORMAT_VERSION:
+        log.warning(f"Ignoring out of date cache snapshot {path}")
+        return 0
+
+    folder = project.project_folder
+
+    for key, branch in data["branches"].items():
+        for child in branch.children.values():
+            # share key tuples with children cached from now on.
+            child.meta_keys = intern_keys(child.meta_keys)
+
+        tree_cache.branches[(folder / key).as_posix()] = branch
+
+    for key, entry in data["highlights"].items():
+        _index_cache[(folder / key).as_posix()] = entry
+
+    _last_saved = _fingerprint()
+    return len(data["branches"])
@@ -1,7 +1,9 @@
 import functools
+import copy
 from http.client import responses
 import urllib.parse
-from typing import Callable, Dict, List, Literal, Type, Union, TypeVar, cast, Any
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, List, Literal, Optional, Tuple, Type, Union, TypeVar, cast, Any
 
 from pydantic import BaseModel, ValidationError
 from jupyter_server.base.handlers import APIHandler
@@ -10,12 +12,17 @@ from tornado.web import HTTPError
 from cassini import env
 from cassini.meta import MetaValidationError
 
+from .config import config
+from .monitor import monitor
+
 
 Q = TypeVar("Q", bound=BaseModel)
 R = TypeVar("R", bound=BaseModel)
 S = TypeVar("S", bound=APIHandler)
 
 RawQueryType = Dict[str, Union[str, List[str]]]
+# raw query string and path parameters of a request.
+QueryKey = Tuple[str, Tuple[Tuple[str, str], ...]]
 
 
 def parse_get_query(raw_query: str) -> RawQueryType:
@@ -44,15 +51,109 @@ def parse_path_query(raw_query: Dict[str, str]) -> Dict[str, List[str]]:
     query = {}
 
     for key, value in raw_query.items():
-        value = value.split('?')[0]  # for reasons I don't understand, it seems to include queries in the url?
-        if '/' in value:
-            query[key] = [v for v in value.split('/') if v]
-        else:
-            query[key] = [value] if value else []
+        value = value.split('?', 1)[0]  # for reasons I don't understand, it seems to include queries in the url?
+        query[key] = [v for v in value.split('/') if v]
     
     return query
 
 
+class QueryCache(Generic[Q]):
+    """
+    Least recently used cache of validated queries, keyed by the raw query string and path parameters of a request.
+
+    The cache keeps its own copy of each validated query, which `validate_get_query` never hands out, so a handler
+    that modifies its query can't affect later requests.
+    """
+
+    def __init__(self) -> None:
+        self._entries: "OrderedDict[QueryKey, Q]" = OrderedDict()
+
+    def get(self, key: QueryKey) -> Optional[Q]:
+        query = self._entries.get(key)
+
+        if query is not None:
+            self._entries.move_to_end(key)
+
+        return query
+
+    def put(self, key: QueryKey, query: Q) -> None:
+        if config.QUERY_CACHE_SIZE <= 0:
+            return
+
+        self._entries[key] = query
+
+        while len(self._entries) > config.QUERY_CACHE_SIZE:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+def _copy_query(query: Q) -> Q:
+    # query values are strings, numbers or flat lists of them e.g. `path`, so copying the lists is as good as a deep
+    # copy, for a fraction of the cost of `model_copy(deep=True)`.
+    new = copy.copy(query)
+
+    for name, value in query.__dict__.items():
+        if isinstance(value, list):
+            new.__dict__[name] = value.copy()
+
+    return new
+
+
+def validate_get_query(
+    query_model: Type[Q], raw_query: str, path_kwargs: Dict[str, str], cache: Optional[QueryCache[Q]] = None
+) -> Q:
+    """
+    Parse and validate the query of a GET request, including any path parameters, against `query_model`.
+
+    Valid queries are kept in `cache`, so repeats of the same request skip straight to a copy of the validated query.
+    """
+    key = (raw_query, tuple(path_kwargs.items()))
+
+    if cache is not None and (cached := cache.get(key)) is not None:
+        return _copy_query(cached)
+
+    query = parse_get_query(raw_query)
+
+    if path_kwargs:
+        path_query = parse_path_query(path_kwargs)
+
+        if set(path_query) & set(query):
+            raise RuntimeError("Receiving the same parameter via query and path, this is not supported")
+        
+        query.update(path_query)
+
+    validated_query = query_model.model_validate(query)
+
+    if cache is not None:
+        cache.put(key, validated_query)
+        return _copy_query(validated_query)
+
+    return validated_query
+
+
+def call_site(path: str, raw_query: str, path_kwargs: Dict[str, str]) -> Tuple[str, str]:
+    """
+    Split a request into its endpoint, which excludes any path parameters, and its query, which includes them.
+    """
+    endpoint = path
+    path_query = {}
+
+    for key, value in path_kwargs.items():
+        value = value.split('?')[0]
+
+        if value and endpoint.endswith(value):
+            endpoint = endpoint[:-len(value)]
+
+        path_query[key] = value
+
+    if path_query:
+        raw_query = "&".join(filter(None, [urllib.parse.urlencode(path_query), raw_query]))
+
+    return endpoint, raw_query
+
+
 def with_types(
     query_model: Type[Q],
     response_model: Type[R],
@@ -60,23 +161,30 @@ def with_types(
 ) -> Callable[[Callable[[S, Q], R]], Callable[[S], None]]:
 
     def wrapper(func: Callable[[S, Q], R]) -> Callable[[S], None]:
+        query_cache: QueryCache[Q] = QueryCache()
     
         def wrap_handler(self: S, **kwargs) -> None:
-            if method == "GET":
-                if kwargs and parse_get_query(self.request.query):
-                    raise RuntimeError("Receiving a query via parameters and path, this is not supported")
-                
-                if kwargs:
-                    query = parse_path_query(kwargs)
-                else:
-                    query = parse_get_query(self.request.query)
-            elif method == "POST":
-                query = self.get_json_body()
-            else:
-                raise HTTPError(405)
-            
+            if not monitor.enabled:
+                handle(self, **kwargs)
+                return
+
+            endpoint, query = call_site(self.request.path, self.request.query, kwargs)
+
+            with monitor.track(endpoint, query):
+                handle(self, **kwargs)
+
+        def handle(self: S, **kwargs) -> None:
+            query: Any
+
             try:
-                validated_query = query_model.model_validate(query)
+                if method == "GET":
+                    query = self.request.query
+                    validated_query = validate_get_query(query_model, query, kwargs, query_cache)
+                elif method == "POST":
+                    query = self.get_json_body()
+                    validated_query = query_model.model_validate(query)
+                else:
+                    raise HTTPError(405)
             except (MetaValidationError, ValidationError) as e:
                 raise HTTPError(400, reason=e.__class__.__name__, log_message=f'Invalid Query {query}, {e}')
             
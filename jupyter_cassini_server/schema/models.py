@@ -1,13 +1,13 @@
 # generated by datamodel-codegen:
 #   filename:  openapi.yaml
-#   timestamp: 2024-10-28T16:42:45+00:00
+#   timestamp: 2026-10-19T17:39:49+00:00
 
 from __future__ import annotations
 
 from enum import Enum
 from typing import Any, Dict, List, Optional, Union
 
-from pydantic import AwareDatetime, BaseModel, ConfigDict, Field, RootModel
+from pydantic import AwareDatetime, BaseModel, ConfigDict, Field, RootModel, conint
 from typing_extensions import Literal
 
 
@@ -36,7 +36,14 @@ class ChildClsFolderInfo(CommonChildClsInfo):
 
 
 class TreePathQuery(BaseModel):
+    model_config = ConfigDict(
+        extra='forbid',
+    )
     path: List[str]
+    sort: Optional[str] = None
+    filter: Optional[str] = None
+    limit: Optional[conint(ge=0)] = None
+    offset: Optional[conint(ge=0)] = None
 
 
 class TreeChildResponse(BaseModel):
@@ -50,6 +57,168 @@ class TreeChildResponse(BaseModel):
     additionalMeta: Optional[Dict[str, Any]] = None
 
 
+class Type1(Enum):
+    object = 'object'
+    array = 'array'
+    string = 'string'
+    number = 'number'
+    boolean = 'boolean'
+    null = 'null'
+
+
+class LazyMetaValue(BaseModel):
+    x_cas_lazy: bool = Field(..., alias='x-cas-lazy')
+    type: Type1
+    size: int
+
+
+class MetaValueResponse(BaseModel):
+    name: str
+    key: str
+    value: Any
+
+
+class HighlightEntry(BaseModel):
+    title: str
+    start: int
+    end: int
+    mimeTypes: List[str]
+
+
+class HighlightsIndex(BaseModel):
+    name: str
+    hltsPath: str
+    size: int
+    entries: List[HighlightEntry]
+
+
+class ExportRecord(TreeChildResponse):
+    ids: List[str]
+    tierClass: str
+    error: Optional[str] = Field(
+        None,
+        description="Why the tier's meta couldn't be read, in which case the fields that come from it are left out.",
+    )
+    name: str
+
+
+class AuditError(BaseModel):
+    loc: str = Field(
+        ...,
+        description='Dotted path to the invalid value, empty if the whole file is invalid.',
+    )
+    msg: str
+    type: str
+
+
+class Kind(Enum):
+    failure = 'failure'
+    progress = 'progress'
+    done = 'done'
+
+
+class AuditRecord(BaseModel):
+    kind: Kind
+    checked: Optional[int] = Field(
+        None, description='Number of meta files checked so far.'
+    )
+    failed: Optional[int] = Field(
+        None, description='Number of invalid meta files found so far.'
+    )
+    last: Optional[str] = Field(
+        None,
+        description='Name of the last tier checked, pass this as `after` to resume the audit from here.',
+    )
+    name: Optional[str] = None
+    metaPath: Optional[str] = None
+    errors: Optional[List[AuditError]] = None
+
+
+class ChangesResponse(BaseModel):
+    epoch: str
+    generation: int = Field(
+        ..., description='The current generation, pass this as `since` next time.'
+    )
+    changed: Dict[str, int] = Field(
+        ..., description='Name of each changed tier -> generation it last changed at.'
+    )
+
+
+class MetaUpdate(BaseModel):
+    name: str
+    set: Optional[Dict[str, Any]] = Field(
+        None, description='Keys to set, and their new values.'
+    )
+    unset: Optional[List[str]] = Field(None, description='Keys to remove.')
+
+
+class MetaUpdateRequest(BaseModel):
+    updates: List[MetaUpdate]
+
+
+class MetaUpdateResponse(BaseModel):
+    updated: List[str] = Field(
+        ..., description='Names of the updated tiers, each once.'
+    )
+    generation: int = Field(
+        ..., description='Generation of the tree after the updates, see `/changes`.'
+    )
+
+
+class StackSample(BaseModel):
+    frames: List[str]
+    count: int = Field(
+        ..., description='Number of samples that found the call at this stack.'
+    )
+
+
+class SlowCall(BaseModel):
+    endpoint: str
+    query: str
+    started: AwareDatetime
+    duration: float = Field(
+        ..., description='Seconds the handler blocked the event loop for.'
+    )
+    samples: List[StackSample] = Field(
+        ...,
+        description='The most common stacks the handler was sampled at, most common first.',
+    )
+
+
+class MonitorResponse(BaseModel):
+    enabled: bool = Field(
+        ..., description='Whether the monitor is running, see `MONITOR` in the config.'
+    )
+    lag: float = Field(
+        ..., description='Seconds the event loop was late by, when last checked.'
+    )
+    maxLag: float = Field(
+        ...,
+        description='Most seconds the event loop has been late by, since the monitor started.',
+    )
+    slowCalls: List[SlowCall] = Field(
+        ..., description='The most recent slow calls, oldest first.'
+    )
+
+
+class TierType(Enum):
+    notebook = 'notebook'
+    folder = 'folder'
+
+
+class TierSummary(BaseModel):
+    ids: List[str]
+    tierType: TierType
+
+
+class LookupBatchRequest(BaseModel):
+    names: List[str] = Field(..., max_length=1000)
+    info: Optional[bool] = Field(
+        False,
+        description='Also respond with the full info of each tier, as `/lookup` would, in `infos`.',
+    )
+
+
 class NewChildInfo(BaseModel):
     model_config = ConfigDict(
         extra='allow',
@@ -68,10 +237,54 @@ class LookupGetParametersQuery(BaseModel):
     name: str
 
 
+class TreeIdsGetParametersQuery(BaseModel):
+    sort: Optional[str] = None
+    filter: Optional[str] = None
+    limit: Optional[conint(ge=0)] = None
+    offset: Optional[conint(ge=0)] = None
+
+
 class OpenGetParametersQuery(BaseModel):
     name: str
 
 
+class MetaValueGetParametersQuery(BaseModel):
+    name: str
+    key: str
+
+
+class HighlightsGetParametersQuery(BaseModel):
+    name: str
+
+
+class HighlightsGetResponse(BaseModel):
+    model_config = ConfigDict(
+        extra='allow',
+    )
+
+
+class HighlightsIndexGetParametersQuery(BaseModel):
+    name: str
+
+
+class ExportGetParametersQuery(BaseModel):
+    root: Optional[str] = None
+    tierClass: Optional[str] = None
+
+
+class AuditGetParametersQuery(BaseModel):
+    root: Optional[str] = None
+    after: Optional[str] = None
+
+
+class ChangesGetParametersQuery(BaseModel):
+    since: Optional[int] = None
+
+
+class MonitorGetParametersQuery(BaseModel):
+    clear: Optional[bool] = None
+
+
 class Type(RootModel[str]):
     root: str
 
@@ -162,8 +375,27 @@ class TreeResponse(TreeChildResponse):
     folder: str
     childClsInfo: Optional[ChildClsInfo] = None
     children: Dict[str, TreeChildResponse]
+    childOrder: Optional[List[str]] = None
+    childCount: Optional[int] = None
+    prefetch: Optional[List[str]] = Field(
+        None,
+        description='Ids of the children most likely to be opened next, most likely first. Their branches are worth fetching\nahead of time.\n',
+    )
     name: str
 
 
 class TierInfo(RootModel[Union[FolderTierInfo, NotebookTierInfo]]):
     root: Union[FolderTierInfo, NotebookTierInfo] = Field(..., discriminator='tierType')
+
+
+class LookupBatchResponse(BaseModel):
+    tiers: Dict[str, TierSummary] = Field(
+        ..., description='Name of each tier found -> its summary.'
+    )
+    infos: Optional[Dict[str, TierInfo]] = Field(
+        None,
+        description='Name of each tier found -> its info, only if `info` was requested.',
+    )
+    missing: List[str] = Field(
+        ..., description="Names that aren't valid, or whose tier doesn't exist."
+    )
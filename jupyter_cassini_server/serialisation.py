@@ -1,8 +1,11 @@
+import json
 from pathlib import Path
 
-from typing import Set, Union
+from typing import Any, Dict, Optional, Set, Union
 from .schema.models import (
     ChildClsInfo, 
+    LazyMetaValue,
+    Type1 as JSONType,
     TreeChildResponse, 
     TreeResponse, 
     ChildClsNotebookInfo, 
@@ -14,15 +17,60 @@ from .schema.models import (
 from cassini import env, Project
 from cassini.core import NotebookTierBase, TierABC
 
+from .config import config
+from .snapshot import DirSnapshot
+
 
 def encode_path(path: Path, project: Project) -> str:
     project_folder = project.project_folder
     return path.relative_to(project_folder).as_posix()
 
 
-def serialize_child(tier: TierABC) -> TreeChildResponse:
+def _json_type(value: Any) -> JSONType:
+    if value is None:
+        return JSONType.null
+    if isinstance(value, bool):
+        return JSONType.boolean
+    if isinstance(value, (int, float)):
+        return JSONType.number
+    if isinstance(value, str):
+        return JSONType.string
+    if isinstance(value, (list, tuple)):
+        return JSONType.array
+    return JSONType.object
+
+
+def serialize_meta_value(value: Any) -> Any:
+    """
+    Replace values larger than `config.MAX_META_VALUE_SIZE` with a `LazyMetaValue` placeholder.
+    """
+    max_size = config.MAX_META_VALUE_SIZE
+
+    if max_size is None or isinstance(value, (bool, int, float)) or value is None:
+        return value
+
+    if isinstance(value, str):
+        size = len(value)
+    else:
+        size = len(json.dumps(value, default=str))
+
+    if size <= max_size:
+        return value
+
+    return LazyMetaValue.model_validate(
+        {'x-cas-lazy': True, 'type': _json_type(value), 'size': size}
+    ).model_dump(by_alias=True, mode='json')
+
+
+def serialize_child(tier: TierABC, snapshot: Optional[DirSnapshot] = None, lazy: bool = True) -> TreeChildResponse:
     """
     Note, doesn't populate children field... maybe will later...
+
+    snapshot: DirSnapshot
+        if given, used to check if the highlights file exists, rather than a stat.
+    lazy: bool
+        send large meta values as `LazyMetaValue` placeholders (see `serialize_meta_value`). `False` to always send
+        them in full.
     """
     assert env.project
     project_folder = env.project.project_folder
@@ -32,7 +80,7 @@ def serialize_child(tier: TierABC) -> TreeChildResponse:
 
         metaPath = tier.meta_file.relative_to(project_folder).as_posix()
         additionalMeta = {
-            key: tier.meta.get(key)
+            key: serialize_meta_value(tier.meta.get(key)) if lazy else tier.meta.get(key)
             for key in tier.meta.keys()
             if key not in ["description", "conclusion", "started"]
         }
@@ -49,7 +97,9 @@ def serialize_child(tier: TierABC) -> TreeChildResponse:
         else:
             outcome = None
 
-        if tier.highlights_file:
+        if tier.highlights_file and (
+            snapshot.exists(tier.highlights_file) if snapshot else tier.highlights_file.exists()
+        ):
             hltsPath = tier.highlights_file.relative_to(project_folder).as_posix()
         else:
             hltsPath = None
@@ -74,10 +124,23 @@ def serialize_child(tier: TierABC) -> TreeChildResponse:
     )
 
 
-def serialize_branch(tier: TierABC) -> TreeResponse:
+def serialize_branch(
+    tier: TierABC,
+    children: Optional[Dict[str, TreeChildResponse]] = None,
+    snapshot: Optional[DirSnapshot] = None,
+    child_meta_keys: Optional[Set[str]] = None,
+) -> TreeResponse:
+    """
+    children: Dict[str, TreeChildResponse]
+        already serialised children of `tier`, e.g. from the tree cache. If not given, they're serialised here.
+    snapshot: DirSnapshot
+        passed on to `serialize_child`.
+    child_meta_keys: Set[str]
+        keys of the `additionalMeta` of all the children, if not given, they're collected from `children`.
+    """
     assert env.project
 
-    core = serialize_child(tier)
+    core = serialize_child(tier, snapshot)
     folder = tier.folder.relative_to(env.project.project_folder).as_posix()
 
     child_cls = tier.child_cls
@@ -96,14 +159,17 @@ def serialize_branch(tier: TierABC) -> TreeResponse:
             children={},
         )
 
-    child_metas: Set[str] = set()
-    children = {}
+    if children is None:
+        children = {child.id: serialize_child(child, snapshot) for child in tier}
 
-    for child in tier:
-        children[child.id] = serialize_child(child)
+    if child_meta_keys is None:
+        child_metas: Set[str] = set()
 
-        if isinstance(child, NotebookTierBase):
-            child_metas.update(child.meta.keys())
+        for child_data in children.values():
+            if child_data.additionalMeta:
+                child_metas.update(child_data.additionalMeta.keys())
+    else:
+        child_metas = set(child_meta_keys)
 
     child_cls_info: Union[ChildClsNotebookInfo, ChildClsFolderInfo]
 
@@ -0,0 +1,119 @@
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from cassini.core import FolderTierBase, NotebookTierBase, TierABC
+
+
+Stamp = Tuple[int, int]
+
+
+def stamp(path: Path) -> Stamp:
+    """
+    `(mtime_ns, size)` of `path`, or `(0, 0)` if it doesn't exist.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return (0, 0)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class DirSnapshot:
+    """
+    Listings of folders, each made with a single `os.scandir`, used to answer existence, file type and mtime checks
+    without a stat per path.
+
+    Intended to live for a single request, so it never needs invalidating.
+
+    Attributes
+    ----------
+    listings : Dict[str, Optional[Dict[str, os.DirEntry]]]
+        folder -> entries by name. `None` if the folder doesn't exist.
+    queries : int
+        number of checks answered, each of which would otherwise have been a stat.
+    scandirs : int
+        number of `os.scandir` calls made.
+    stats : int
+        number of stat calls made to get mtimes. (On Windows these come free with the scandir).
+    """
+
+    def __init__(self) -> None:
+        self.listings: Dict[str, Optional[Dict[str, os.DirEntry]]] = {}
+        self.stamps: Dict[str, Stamp] = {}
+        self.queries = 0
+        self.scandirs = 0
+        self.stats = 0
+
+    def _entry(self, path: Path) -> Optional[os.DirEntry]:
+        self.queries += 1
+        folder = path.parent.as_posix()
+
+        if folder not in self.listings:
+            self.scandirs += 1
+            try:
+                with os.scandir(path.parent) as entries:
+                    self.listings[folder] = {entry.name: entry for entry in entries}
+            except (FileNotFoundError, NotADirectoryError):
+                self.listings[folder] = None
+
+        listing = self.listings[folder]
+        return listing.get(path.name) if listing else None
+
+    @property
+    def saved(self) -> int:
+        """
+        Number of syscalls saved compared to checking each path individually.
+        """
+        return self.queries - self.scandirs - self.stats
+
+    def exists(self, path: Path) -> bool:
+        return self._entry(path) is not None
+
+    def is_dir(self, path: Path) -> bool:
+        entry = self._entry(path)
+        return entry is not None and entry.is_dir()
+
+    def is_file(self, path: Path) -> bool:
+        entry = self._entry(path)
+        return entry is not None and entry.is_file()
+
+    def stamp(self, path: Path) -> Stamp:
+        """
+        `(mtime_ns, size)` of `path`, or `(0, 0)` if it doesn't exist.
+        """
+        key = path.as_posix()
+
+        if key in self.stamps:
+            self.queries += 1
+            return self.stamps[key]
+
+        entry = self._entry(path)
+
+        if entry is None:
+            result = (0, 0)
+        else:
+            if os.name != "nt":
+                self.stats += 1
+            stat = entry.stat()
+            result = (stat.st_mtime_ns, stat.st_size)
+
+        self.stamps[key] = result
+        return result
+
+    def tier_exists(self, tier: TierABC) -> bool:
+        """
+        Equivalent to `tier.exists()`. Tiers that override `exists` are asked directly.
+        """
+        exists = type(tier).exists
+
+        if exists is NotebookTierBase.exists:
+            assert isinstance(tier, NotebookTierBase)
+            return bool(tier.file and self.exists(tier.folder) and self.exists(tier.meta_file))
+        elif exists is FolderTierBase.exists:
+            return self.exists(tier.folder)
+        else:
+            return tier.exists()
+
+    def __repr__(self) -> str:
+        return f"<DirSnapshot {self.scandirs} scandirs, {self.stats} stats, {self.saved} syscalls saved>"
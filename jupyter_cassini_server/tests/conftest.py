@@ -0,0 +1,38 @@
+import shutil
+import os
+import sys
+
+import pytest
+from cassini import env
+from cassini.utils import find_project
+
+
+@pytest.fixture
+def project_via_env(tmp_path):
+    env._reset()
+    
+    assert env.project is None
+
+    project_file = shutil.copy(
+        "jupyter_cassini_server/tests/project/cas_project.py",
+        tmp_path / "cas_project.py",
+    )
+
+    os.environ["CASSINI_PROJECT"] = project_file.as_posix()
+    project = find_project()
+    project.setup_files()
+
+    yield project
+
+    del sys.modules['cas_project']
+
+
+@pytest.fixture
+def project_with_wps(project_via_env):
+    project = project_via_env
+
+    for i, status in enumerate(['done', 'todo', 'done', 'todo', 'done'], start=1):
+        wp = project[f'WP{i}']
+        wp.setup_files(meta={'status': status, 'rank': i % 3})
+    
+    yield project
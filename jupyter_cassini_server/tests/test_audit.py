@@ -0,0 +1,60 @@
+import json
+from concurrent.futures import Future
+from unittest.mock import Mock
+
+from .. import audit
+from ..audit import main
+from ..config import config
+from ..schema.models import Kind
+
+
+def test_cli_resumes_from_checkpoint(project_with_wps, tmp_path, capsys):
+    project = project_with_wps
+    project['WP2'].meta_file.write_text('{"started": "not a date"}')
+    project['WP4'].meta_file.write_text('{"started": "not a date"}')
+
+    checkpoint = tmp_path / 'audit.checkpoint'
+    checkpoint.write_text('WP3')
+
+    assert main(['--checkpoint', str(checkpoint)]) == 1
+
+    failures = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [failure['name'] for failure in failures] == ['WP4']
+    assert not checkpoint.exists()
+
+
+def test_cli_all_valid(project_with_wps, capsys):
+    assert main([]) == 0
+    assert capsys.readouterr().out == ''
+
+
+class BrokenPool:
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_exception(RuntimeError('worker died'))
+        return future
+
+
+def test_serial_by_default(project_with_wps, monkeypatch):
+    monkeypatch.setattr(audit, 'worker_count', lambda: 4)
+    monkeypatch.setattr(audit, 'get_pool', Mock(side_effect=AssertionError('pool used')))
+
+    records = list(audit.iter_audit(project_with_wps.home))
+    assert records[-1].checked == 5
+
+
+def test_worker_failure_validated_serially(project_with_wps, monkeypatch):
+    project = project_with_wps
+    project['WP2'].meta_file.write_text('{"started": "not a date"}')
+
+    monkeypatch.setattr(config, 'AUDIT_PARALLEL', True)
+    monkeypatch.setattr(config, 'AUDIT_CHUNK_SIZE', 2)
+    monkeypatch.setattr(audit, 'worker_count', lambda: 4)
+    monkeypatch.setattr(audit, 'find_project_file', lambda project: 'cas_project.py')
+    monkeypatch.setattr(audit, 'get_pool', lambda: BrokenPool())
+
+    records = list(audit.iter_audit(project.home))
+
+    assert [record.name for record in records if record.kind == Kind.failure] == ['WP2']
+    assert records[-1].kind == Kind.done
+    assert records[-1].checked == 5
@@ -0,0 +1,45 @@
+import datetime
+
+from ..cache import BranchCache, CompactChild, intern_keys
+from ..schema.models import TreeChildResponse
+
+
+def test_compact_child_round_trip():
+    child = TreeChildResponse(
+        name='WP1.1a',
+        info='An info',
+        started=datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc),
+        notebookPath='WorkPackages/WP1/WP1.1/WP1.1a.ipynb',
+        metaPath='WorkPackages/WP1/WP1.1/.smpls/WP1.1a.json',
+        hltsPath='Elsewhere/WP1.1a.hlts',
+        additionalMeta={'status': 'done', 'rank': 1},
+    )
+
+    record = CompactChild.from_model(child, 'WorkPackages/WP1/WP1.1/')
+
+    assert record.notebook == 'WP1.1a.ipynb'
+    assert record.meta == '.smpls/WP1.1a.json'
+    assert record.hlts == '/Elsewhere/WP1.1a.hlts'
+    assert record.meta_value('status') == 'done'
+    assert record.meta_value('missing') is None
+
+    assert record.to_model('WorkPackages/WP1/WP1.1/') == child
+
+
+def test_meta_keys_shared():
+    a = CompactChild.from_model(TreeChildResponse(name='a', additionalMeta={'x': 1, 'y': 2}), '')
+    b = CompactChild.from_model(TreeChildResponse(name='b', additionalMeta={'x': 3, 'y': 4}), '')
+
+    assert a.meta_keys is b.meta_keys
+    assert intern_keys(['x', 'y']) is a.meta_keys
+
+
+def test_most_recent():
+    branch = BranchCache()
+
+    for id_, day in [('a', 2), ('b', None), ('c', 3), ('d', 1)]:
+        started = datetime.datetime(2023, 1, day, tzinfo=datetime.timezone.utc) if day else None
+        branch.children[id_] = CompactChild.from_model(TreeChildResponse(name=id_, started=started), '')
+
+    assert branch.most_recent(2) == ['c', 'a']
+    assert branch.most_recent(10) == ['c', 'a', 'd']
@@ -1,37 +1,25 @@
-import shutil
-import os
+import atexit
+import datetime
+import json
+import math
 from unittest.mock import Mock
-import sys
 
 import pytest
 from tornado.httpclient import HTTPClientError
-from cassini import env
-from cassini.utils import find_project
 
-from ..schema.models import NotebookTierInfo, FolderTierInfo, TreeResponse, Status, Status1, NewChildInfo
+import jupyter_cassini_server as extension
 
-
-CWD = os.getcwd()
-
-
-@pytest.fixture
-def project_via_env(tmp_path):
-    env._reset()
-    
-    assert env.project is None
-
-    project_file = shutil.copy(
-        "jupyter_cassini_server/tests/project/cas_project.py",
-        tmp_path / "cas_project.py",
-    )
-
-    os.environ["CASSINI_PROJECT"] = project_file.as_posix()
-    project = find_project()
-    project.setup_files()
-
-    yield project
-
-    del sys.modules['cas_project']
+from .. import meta_update
+from ..cache import tree_cache
+from ..config import config
+from ..monitor import monitor
+from ..parallel import get_pool, shutdown_pool
+from ..schema.models import (
+    NotebookTierInfo, FolderTierInfo, TreeResponse, Status, Status1, NewChildInfo, LazyMetaValue, MetaValueResponse,
+    HighlightsIndex, ExportRecord, ChangesResponse, MetaUpdate, MetaUpdateRequest, MetaUpdateResponse, AuditRecord, MonitorResponse,
+    LookupBatchRequest, LookupBatchResponse, TierSummary, TierType, TierInfo,
+    Kind
+)
 
 
 async def test_lookup_home(project_via_env, jp_fetch) -> None:
@@ -55,6 +43,41 @@ async def test_lookup_WP1(project_via_env, jp_fetch) -> None:
     assert info.name == 'WP1'
 
 
+async def test_lookup_batch(project_with_wps, jp_fetch) -> None:
+    body = LookupBatchRequest(names=['Home', 'WP1', 'WP2', 'WP1', 'WP9', 'not a name'])
+
+    response = await jp_fetch("jupyter_cassini", "lookupBatch", body=body.model_dump_json(), method='POST')
+    result = LookupBatchResponse.model_validate_json(response.body.decode())
+
+    assert list(result.tiers) == ['Home', 'WP1', 'WP2']
+    assert result.tiers['Home'] == TierSummary(ids=[], tierType=TierType.folder)
+    assert result.tiers['WP2'] == TierSummary(ids=['2'], tierType=TierType.notebook)
+    assert result.missing == ['WP9', 'not a name']
+
+
+async def test_lookup_batch_info(project_with_wps, jp_fetch) -> None:
+    body = LookupBatchRequest(names=['Home', 'WP1', 'WP9'], info=True)
+
+    response = await jp_fetch("jupyter_cassini", "lookupBatch", body=body.model_dump_json(), method='POST')
+    result = LookupBatchResponse.model_validate_json(response.body.decode())
+
+    single = await jp_fetch("jupyter_cassini", "lookup", params={"name": "WP1"})
+
+    assert result.infos is not None
+    assert list(result.infos) == ['Home', 'WP1']
+    assert result.infos['WP1'] == TierInfo.model_validate_json(single.body.decode())
+    assert result.missing == ['WP9']
+
+
+async def test_lookup_batch_too_many(project_via_env, jp_fetch) -> None:
+    body = json.dumps({'names': ['WP1'] * 1001})
+
+    with pytest.raises(HTTPClientError) as e:
+        await jp_fetch("jupyter_cassini", "lookupBatch", body=body, method='POST')
+
+    assert e.value.code == 400
+
+
 async def test_tree_home(project_via_env, jp_fetch) -> None:    
     reponse = await jp_fetch("jupyter_cassini", "tree")
 
@@ -151,3 +174,491 @@ async def test_new_child(project_via_env, jp_fetch) -> None:
 
     assert project['WP1'].exists()
 
+
+
+async def test_tree_sort(project_with_wps, jp_fetch) -> None:
+    response = await jp_fetch("jupyter_cassini", "tree", params={"sort": "-additionalMeta.rank"})
+
+    tree = TreeResponse.model_validate_json(response.body.decode())
+    assert tree.childOrder == ['2', '5', '1', '4', '3']
+    assert tree.childCount == 5
+
+
+async def test_tree_filter_and_page(project_with_wps, jp_fetch) -> None:
+    response = await jp_fetch("jupyter_cassini", "tree", params={"filter": "additionalMeta.status:done", "sort": "id", "limit": "2", "offset": "1"})
+
+    tree = TreeResponse.model_validate_json(response.body.decode())
+    assert tree.childOrder == ['3', '5']
+    assert list(tree.children) == ['3', '5']
+    assert tree.childCount == 3
+
+
+async def test_tree_prefetch(project_with_wps, jp_fetch, monkeypatch) -> None:
+    project = project_with_wps
+    monkeypatch.setattr(config, 'PREFETCH_HINTS', 3)
+
+    for i, day in enumerate([3, 1, 5, 2, 4], start=1):
+        project[f'WP{i}'].meta['started'] = datetime.datetime(2023, 1, day, tzinfo=datetime.timezone.utc)
+
+    response = await jp_fetch("jupyter_cassini", "tree")
+    assert TreeResponse.model_validate_json(response.body.decode()).prefetch == ['3', '5', '1']
+
+    monkeypatch.setattr(config, 'PREFETCH_HINTS', 0)
+
+    response = await jp_fetch("jupyter_cassini", "tree")
+    assert TreeResponse.model_validate_json(response.body.decode()).prefetch is None
+
+
+async def test_tree_invalid_sort(project_with_wps, jp_fetch) -> None:
+    with pytest.raises(HTTPClientError) as e:
+        await jp_fetch("jupyter_cassini", "tree", params={"sort": "notAField"})
+
+    assert e.value.code == 400
+
+    with pytest.raises(HTTPClientError) as e:
+        await jp_fetch("jupyter_cassini", "tree", params={"filter": "no separator"})
+
+    assert e.value.code == 400
+
+
+async def test_tree_cache_sees_meta_changes(project_with_wps, jp_fetch) -> None:
+    project = project_with_wps
+
+    response = await jp_fetch("jupyter_cassini", "tree", params={"filter": "additionalMeta.status:todo"})
+    assert set(TreeResponse.model_validate_json(response.body.decode()).children) == {'2', '4'}
+
+    project['WP1'].meta['status'] = 'todo'
+    
+    response = await jp_fetch("jupyter_cassini", "tree", params={"filter": "additionalMeta.status:todo"})
+    assert set(TreeResponse.model_validate_json(response.body.decode()).children) == {'1', '2', '4'}
+
+
+async def test_tree_cache_sees_new_child(project_with_wps, jp_fetch) -> None:
+    response = await jp_fetch("jupyter_cassini", "tree")
+    assert len(TreeResponse.model_validate_json(response.body.decode()).children) == 5
+
+    new_child_info = NewChildInfo(id='6', parent='Home', template='WorkPackage.ipynb')
+    await jp_fetch("jupyter_cassini", "newChild", body=new_child_info.model_dump_json(), method='POST')
+
+    response = await jp_fetch("jupyter_cassini", "tree")
+    assert len(TreeResponse.model_validate_json(response.body.decode()).children) == 6
+
+
+async def test_tree_cache_sees_new_highlights(project_with_wps, jp_fetch) -> None:
+    project = project_with_wps
+
+    response = await jp_fetch("jupyter_cassini", "tree")
+    assert TreeResponse.model_validate_json(response.body.decode()).children['1'].hltsPath is None
+
+    project['WP1'].highlights_file.write_text('{}')
+
+    response = await jp_fetch("jupyter_cassini", "tree")
+    assert TreeResponse.model_validate_json(response.body.decode()).children['1'].hltsPath == 'WorkPackages/.wps/WP1.hlts'
+
+
+async def test_tree_parallel_matches_serial(project_with_wps, jp_fetch, monkeypatch) -> None:
+    project = project_with_wps
+    project['WP1'].highlights_file.write_text('{}')
+
+    response = await jp_fetch("jupyter_cassini", "tree")
+    serial = TreeResponse.model_validate_json(response.body.decode())
+
+    monkeypatch.setattr(config, 'PARALLEL_MIN_CHILDREN', 2)
+    monkeypatch.setattr(config, 'PARALLEL_WORKERS', 2)
+    tree_cache.invalidate(project.home)
+
+    try:
+        response = await jp_fetch("jupyter_cassini", "tree")
+    finally:
+        shutdown_pool()
+
+    assert TreeResponse.model_validate_json(response.body.decode()) == serial
+
+
+def test_pool_shut_down_at_exit(project_via_env, monkeypatch) -> None:
+    registered = []
+
+    monkeypatch.setattr(extension, 'setup_handlers', lambda web_app: None)
+    monkeypatch.setattr(atexit, 'register', lambda func, *args: registered.append((func, args)))
+
+    extension._load_jupyter_server_extension(Mock())
+    pool = get_pool()
+
+    [(shutdown, args)] = registered
+    shutdown(*args)
+
+    with pytest.raises(RuntimeError):
+        pool.submit(print)
+
+
+async def test_tree_lazy_meta(project_with_wps, jp_fetch, monkeypatch) -> None:
+    project = project_with_wps
+    monkeypatch.setattr(config, 'MAX_META_VALUE_SIZE', 100)
+
+    big = list(range(100))
+    project['WP1'].meta['results'] = big
+
+    response = await jp_fetch("jupyter_cassini", "tree")
+    tree = TreeResponse.model_validate_json(response.body.decode())
+    meta = tree.children['1'].additionalMeta
+
+    assert meta['status'] == 'done'
+    placeholder = LazyMetaValue.model_validate(meta['results'])
+    assert placeholder.type.value == 'array'
+    assert placeholder.size > 100
+
+    response = await jp_fetch("jupyter_cassini", "metaValue", params={'name': 'WP1', 'key': 'results'})
+    assert MetaValueResponse.model_validate_json(response.body.decode()).value == big
+
+
+async def test_meta_value_missing(project_with_wps, jp_fetch) -> None:
+    with pytest.raises(HTTPClientError) as e:
+        await jp_fetch("jupyter_cassini", "metaValue", params={'name': 'WP1', 'key': 'notAKey'})
+    
+    assert e.value.code == 404
+
+
+@pytest.fixture
+def wp1_highlights(project_with_wps):
+    project = project_with_wps
+    wp1 = project['WP1']
+
+    wp1.add_highlight('A Plot', [{'data': {'image/png': 'abc' * 1000, 'text/plain': 'plot'}, 'metadata': {}}])
+    wp1.add_highlight('Ünïcode', [{'data': {'text/plain': 'ßtuff'}, 'metadata': {}}])
+
+    yield wp1
+
+
+async def test_highlights(wp1_highlights, jp_fetch) -> None:
+    wp1 = wp1_highlights
+
+    response = await jp_fetch("jupyter_cassini", "highlights", params={'name': 'WP1'})
+    
+    assert response.code == 200
+    assert response.headers['Content-Type'] == 'application/json'
+    assert json.loads(response.body) == wp1.get_highlights()
+    etag = response.headers['Etag']
+
+    response = await jp_fetch("jupyter_cassini", "highlights", params={'name': 'WP1'}, method='HEAD')
+
+    assert response.code == 200
+    assert response.body == b''
+    assert response.headers['Etag'] == etag
+
+    with pytest.raises(HTTPClientError) as e:
+        await jp_fetch("jupyter_cassini", "highlights", params={'name': 'WP1'}, headers={'If-None-Match': etag})
+
+    assert e.value.code == 304
+
+
+async def test_highlights_missing(project_with_wps, jp_fetch) -> None:
+    with pytest.raises(HTTPClientError) as e:
+        await jp_fetch("jupyter_cassini", "highlights", params={'name': 'WP2'})
+
+    assert e.value.code == 404
+
+
+async def test_highlights_index_ranges(wp1_highlights, jp_fetch) -> None:
+    wp1 = wp1_highlights
+
+    response = await jp_fetch("jupyter_cassini", "highlightsIndex", params={'name': 'WP1'})
+    index = HighlightsIndex.model_validate_json(response.body.decode())
+
+    assert [entry.title for entry in index.entries] == ['A Plot', 'Ünïcode']
+    assert index.entries[0].mimeTypes == ['image/png', 'text/plain']
+
+    for entry in index.entries:
+        response = await jp_fetch(
+            "jupyter_cassini", "highlights", params={'name': 'WP1'}, headers={'Range': f'bytes={entry.start}-{entry.end - 1}'}
+        )
+        assert response.code == 206
+        assert json.loads(response.body) == wp1.get_highlights()[entry.title]
+
+
+async def test_highlights_index_corrupt(project_with_wps, jp_fetch) -> None:
+    project_with_wps['WP1'].highlights_file.write_text('{"title": [{"data": {}}')
+
+    with pytest.raises(HTTPClientError) as e:
+        await jp_fetch("jupyter_cassini", "highlightsIndex", params={'name': 'WP1'})
+
+    assert e.value.code == 500
+
+
+@pytest.fixture
+def project_with_samples(project_with_wps):
+    project = project_with_wps
+
+    project['WP1.1'].setup_files()
+    project['WP1.1a'].setup_files(meta={'status': 'done'})
+    project['WP1.1b'].setup_files()
+    project['WP2.1'].setup_files()
+    project['WP2.1a'].setup_files()
+
+    yield project
+
+
+async def test_export(project_with_samples, jp_fetch, monkeypatch) -> None:
+    monkeypatch.setattr(config, 'EXPORT_FLUSH_EVERY', 2)
+
+    response = await jp_fetch("jupyter_cassini", "export")
+
+    assert response.headers['Content-Type'] == 'application/x-ndjson'
+    records = [ExportRecord.model_validate_json(line) for line in response.body.decode().splitlines()]
+    
+    assert [record.name for record in records[:5]] == ['Home', 'WP1', 'WP1.1', 'WP1.1a', 'WP1.1b']
+    assert len(records) == 1 + 5 + 2 + 3
+    assert records[3].additionalMeta == {'status': 'done'}
+    assert records[3].ids == ['1', '1', 'a']
+
+
+async def test_export_full_meta(project_with_samples, jp_fetch, monkeypatch) -> None:
+    monkeypatch.setattr(config, 'MAX_META_VALUE_SIZE', 100)
+
+    big = list(range(100))
+    project_with_samples['WP1'].meta['results'] = big
+
+    response = await jp_fetch("jupyter_cassini", "export", params={'root': 'WP1'})
+    records = [ExportRecord.model_validate_json(line) for line in response.body.decode().splitlines()]
+
+    assert records[0].additionalMeta['results'] == big
+
+
+async def test_export_filtered(project_with_samples, jp_fetch) -> None:
+    response = await jp_fetch("jupyter_cassini", "export", params={'root': 'WP1', 'tierClass': 'sample'})
+
+    records = [ExportRecord.model_validate_json(line) for line in response.body.decode().splitlines()]
+    assert [record.name for record in records] == ['WP1.1a', 'WP1.1b']
+    assert all(record.tierClass == 'Sample' for record in records)
+
+
+async def test_export_invalid_class(project_with_samples, jp_fetch) -> None:
+    with pytest.raises(HTTPClientError) as e:
+        await jp_fetch("jupyter_cassini", "export", params={'tierClass': 'notAClass'})
+
+    assert e.value.code == 404
+
+
+async def test_changes(project_with_wps, jp_fetch, monkeypatch) -> None:
+    project = project_with_wps
+    monkeypatch.setattr(config, 'CHANGES_REFRESH_INTERVAL', 0)
+
+    await jp_fetch("jupyter_cassini", "tree")
+
+    response = await jp_fetch("jupyter_cassini", "changes")
+    start = ChangesResponse.model_validate_json(response.body.decode())
+    assert start.changed == {}
+
+    response = await jp_fetch("jupyter_cassini", "changes", params={"since": start.generation})
+    assert ChangesResponse.model_validate_json(response.body.decode()).changed == {}
+
+    project['WP2'].meta['status'] = 'done'
+
+    response = await jp_fetch("jupyter_cassini", "changes", params={"since": start.generation})
+    changes = ChangesResponse.model_validate_json(response.body.decode())
+
+    assert changes.epoch == start.epoch
+    assert set(changes.changed) == {'Home', 'WP2'}
+    assert changes.generation > start.generation
+
+    new_child_info = NewChildInfo(id='6', parent='Home', template='WorkPackage.ipynb')
+    await jp_fetch("jupyter_cassini", "newChild", body=new_child_info.model_dump_json(), method='POST')
+
+    response = await jp_fetch("jupyter_cassini", "changes", params={"since": changes.generation})
+    assert set(ChangesResponse.model_validate_json(response.body.decode()).changed) == {'Home'}
+
+
+async def test_changes_refresh_interval(project_with_wps, jp_fetch, monkeypatch) -> None:
+    project = project_with_wps
+    monkeypatch.setattr(config, 'CHANGES_REFRESH_INTERVAL', 60)
+    tree_cache.refreshed = -math.inf
+
+    await jp_fetch("jupyter_cassini", "tree")
+
+    response = await jp_fetch("jupyter_cassini", "changes")
+    start = ChangesResponse.model_validate_json(response.body.decode())
+
+    project['WP2'].meta['status'] = 'done'
+
+    # checked too recently to look again.
+    response = await jp_fetch("jupyter_cassini", "changes", params={"since": start.generation})
+    assert ChangesResponse.model_validate_json(response.body.decode()).changed == {}
+
+    tree_cache.refreshed = -math.inf
+
+    response = await jp_fetch("jupyter_cassini", "changes", params={"since": start.generation})
+    assert set(ChangesResponse.model_validate_json(response.body.decode()).changed) == {'Home', 'WP2'}
+
+
+async def test_update_meta(project_with_wps, jp_fetch) -> None:
+    project = project_with_wps
+    await jp_fetch("jupyter_cassini", "tree")
+
+    request = MetaUpdateRequest(updates=[
+        MetaUpdate(name='WP1', set={'status': 'todo', 'description': 'New'}),
+        MetaUpdate(name='WP2', unset=['rank']),
+    ])
+    response = await jp_fetch("jupyter_cassini", "updateMeta", body=request.model_dump_json(), method='POST')
+    assert MetaUpdateResponse.model_validate_json(response.body.decode()).updated == ['WP1', 'WP2']
+
+    assert project['WP1'].meta['status'] == 'todo'
+    assert project['WP1'].description == 'New'
+    assert 'rank' not in project['WP2'].meta.keys()
+    assert not list(project['WP1'].meta_file.parent.glob('*.tmp'))
+
+    response = await jp_fetch("jupyter_cassini", "tree")
+    tree = TreeResponse.model_validate_json(response.body.decode())
+    assert tree.children['1'].info == 'New'
+    assert 'rank' not in tree.children['2'].additionalMeta
+
+
+async def test_update_meta_invalid_writes_nothing(project_with_wps, jp_fetch) -> None:
+    project = project_with_wps
+
+    request = MetaUpdateRequest(updates=[
+        MetaUpdate(name='WP1', set={'status': 'todo'}),
+        MetaUpdate(name='WP2', set={'started': 'not a date'}),
+        MetaUpdate(name='WP9'),
+    ])
+
+    with pytest.raises(HTTPClientError) as e:
+        await jp_fetch("jupyter_cassini", "updateMeta", body=request.model_dump_json(), method='POST')
+
+    assert e.value.code == 400
+    assert set(json.loads(json.loads(e.value.response.body)['message'])) == {'WP2', 'WP9'}
+    assert project['WP1'].meta['status'] == 'done'
+
+
+async def test_update_meta_same_tier(project_with_wps, jp_fetch) -> None:
+    project = project_with_wps
+
+    request = MetaUpdateRequest(updates=[
+        MetaUpdate(name='WP1', set={'status': 'todo'}),
+        MetaUpdate(name='WP1', set={'description': 'New'}),
+    ])
+    response = await jp_fetch("jupyter_cassini", "updateMeta", body=request.model_dump_json(), method='POST')
+    assert MetaUpdateResponse.model_validate_json(response.body.decode()).updated == ['WP1']
+
+    assert project['WP1'].meta['status'] == 'todo'
+    assert project['WP1'].description == 'New'
+
+
+async def test_update_meta_write_fails(project_with_wps, jp_fetch, monkeypatch) -> None:
+    project = project_with_wps
+    monkeypatch.setattr(config, 'CHANGES_REFRESH_INTERVAL', 60)
+
+    await jp_fetch("jupyter_cassini", "tree")
+    response = await jp_fetch("jupyter_cassini", "changes")
+    start = ChangesResponse.model_validate_json(response.body.decode())
+
+    write_atomic = meta_update.write_atomic
+    unwritable = project['WP3'].meta_file
+
+    def fail_on_wp3(path, text):
+        if path == unwritable:
+            raise PermissionError(f"Permission denied: '{path}'")
+        write_atomic(path, text)
+
+    monkeypatch.setattr(meta_update, 'write_atomic', fail_on_wp3)
+
+    request = MetaUpdateRequest(updates=[
+        MetaUpdate(name='WP1', set={'status': 'todo'}),
+        MetaUpdate(name='WP3', set={'status': 'todo'}),
+    ])
+
+    with pytest.raises(HTTPClientError) as e:
+        await jp_fetch("jupyter_cassini", "updateMeta", body=request.model_dump_json(), method='POST')
+
+    assert e.value.code == 500
+    assert set(json.loads(json.loads(e.value.response.body)['message'])) == {'WP3'}
+    assert project['WP1'].meta['status'] == 'todo'
+    assert project['WP3'].meta['status'] == 'done'
+
+    response = await jp_fetch("jupyter_cassini", "changes", params={"since": start.generation})
+    assert set(ChangesResponse.model_validate_json(response.body.decode()).changed) == {'Home', 'WP1'}
+
+
+@pytest.fixture
+def project_with_broken_meta(project_with_wps):
+    project = project_with_wps
+    project['WP2'].meta_file.write_text('{"started": "not a date"}')
+    project['WP4'].meta_file.write_text('{not json')
+    yield project
+
+
+async def test_update_meta_broken_files(project_with_broken_meta, jp_fetch) -> None:
+    project = project_with_broken_meta
+
+    request = MetaUpdateRequest(updates=[MetaUpdate(name='WP2', set={'status': 'todo'}), MetaUpdate(name='WP4')])
+
+    with pytest.raises(HTTPClientError) as e:
+        await jp_fetch("jupyter_cassini", "updateMeta", body=request.model_dump_json(), method='POST')
+
+    assert e.value.code == 400
+    assert set(json.loads(json.loads(e.value.response.body)['message'])) == {'WP2', 'WP4'}
+
+    # fixing the broken value.
+    request = MetaUpdateRequest(updates=[MetaUpdate(name='WP2', unset=['started'])])
+    await jp_fetch("jupyter_cassini", "updateMeta", body=request.model_dump_json(), method='POST')
+
+    assert project['WP2'].meta_file.read_text() == '{}'
+
+
+async def test_export_broken_meta(project_with_broken_meta, jp_fetch, monkeypatch) -> None:
+    monkeypatch.setattr(config, 'EXPORT_FLUSH_EVERY', 2)
+
+    response = await jp_fetch("jupyter_cassini", "export")
+    records = [ExportRecord.model_validate_json(line) for line in response.body.decode().splitlines()]
+
+    assert [record.name for record in records] == ['Home', 'WP1', 'WP2', 'WP3', 'WP4', 'WP5']
+    assert [record.name for record in records if record.error] == ['WP2', 'WP4']
+    assert records[2].ids == ['2'] and records[2].metaPath is None
+    assert records[3].additionalMeta == {'status': 'done', 'rank': 0}
+
+
+async def test_audit(project_with_broken_meta, jp_fetch, monkeypatch) -> None:
+    monkeypatch.setattr(config, 'AUDIT_CHUNK_SIZE', 2)
+
+    response = await jp_fetch("jupyter_cassini", "audit")
+    records = [AuditRecord.model_validate_json(line) for line in response.body.decode().splitlines()]
+
+    failures = [record for record in records if record.kind == Kind.failure]
+    assert [failure.name for failure in failures] == ['WP2', 'WP4']
+    assert failures[0].errors[0].loc == 'started'
+
+    assert [record.kind for record in records].count(Kind.progress) == 3
+    assert records[-1].kind == Kind.done
+    assert records[-1].checked == 5
+    assert records[-1].failed == 2
+
+
+async def test_audit_resume(project_with_broken_meta, jp_fetch) -> None:
+    response = await jp_fetch("jupyter_cassini", "audit", params={"after": "WP3"})
+    records = [AuditRecord.model_validate_json(line) for line in response.body.decode().splitlines()]
+
+    assert [record.name for record in records if record.kind == Kind.failure] == ['WP4']
+    assert records[-1].checked == 2
+
+
+async def test_monitor(project_with_wps, jp_fetch, monkeypatch) -> None:
+    monkeypatch.setattr(config, 'MONITOR_SLOW_CALL_SECONDS', 0)
+
+    response = await jp_fetch("jupyter_cassini", "monitor")
+    assert not MonitorResponse.model_validate_json(response.body.decode()).enabled
+
+    monitor.start()
+
+    try:
+        await jp_fetch("jupyter_cassini", "tree", "1")
+        response = await jp_fetch("jupyter_cassini", "monitor", params={"clear": "true"})
+    finally:
+        monitor.stop()
+
+    report = MonitorResponse.model_validate_json(response.body.decode())
+    assert report.enabled
+
+    slow_call, = report.slowCalls
+    assert slow_call.endpoint.endswith('/jupyter_cassini/tree')
+    assert slow_call.query == 'path=%2F1'
+
+    # only the call to /monitor itself is left.
+    assert [call.endpoint.split('/')[-1] for call in monitor.slow_calls] == ['monitor']
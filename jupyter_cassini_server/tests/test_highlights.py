@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+from ..highlights import parse_highlights_index
+
+
+def test_index_empty():
+    assert parse_highlights_index(' { } ') == []
+
+
+def test_index_non_ascii():
+    highlights = {
+        'Ünïcode': [{'data': {'text/plain': 'ßtuff'}, 'metadata': {}}],
+        'Plot': [{'data': {'image/png': 'abc'}, 'metadata': {}}, {'data': {'text/plain': 'a'}, 'metadata': {}}],
+    }
+    raw = json.dumps(highlights, ensure_ascii=False, indent=2).encode('utf-8')
+
+    entries = parse_highlights_index(raw.decode('utf-8'))
+
+    assert [entry.title for entry in entries] == list(highlights)
+    assert entries[1].mimeTypes == ['image/png', 'text/plain']
+
+    for entry in entries:
+        assert json.loads(raw[entry.start:entry.end]) == highlights[entry.title]
+
+
+def test_index_invalid():
+    with pytest.raises(ValueError):
+        parse_highlights_index('["not", "highlights"]')
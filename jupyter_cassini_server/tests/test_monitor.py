@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+import pytest
+
+from ..config import config
+from ..monitor import monitor
+from ..safety import call_site
+from ..schema.models import MonitorResponse
+
+
+@pytest.fixture
+def running_monitor(monkeypatch):
+    monkeypatch.setattr(config, 'MONITOR_PROBE_INTERVAL', 0.01)
+    monkeypatch.setattr(config, 'MONITOR_SLOW_CALL_SECONDS', 0.05)
+    monkeypatch.setattr(config, 'MONITOR_SAMPLE_INTERVAL', 0.005)
+
+    monitor.start()
+    yield monitor
+    monitor.stop()
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+
+    while time.perf_counter() < end:
+        pass
+
+
+def test_call_site():
+    assert call_site('/jupyter_cassini/tree/1/2', '', {'path': '/1/2'}) == ('/jupyter_cassini/tree', 'path=%2F1%2F2')
+    assert call_site('/jupyter_cassini/lookup', 'name=WP1', {}) == ('/jupyter_cassini/lookup', 'name=WP1')
+
+
+def test_track_disabled(monkeypatch):
+    monkeypatch.setattr(config, 'MONITOR_SLOW_CALL_SECONDS', 0)
+    slow_calls = len(monitor.slow_calls)
+
+    with monitor.track('/endpoint', ''):
+        busy_wait(0.01)
+
+    assert len(monitor.slow_calls) == slow_calls
+
+
+async def test_slow_call(running_monitor):
+    with running_monitor.track('/endpoint', 'a=1'):
+        busy_wait(0.01)
+
+    assert not running_monitor.slow_calls
+
+    with running_monitor.track('/endpoint', 'a=2'):
+        busy_wait(0.1)
+
+    slow_call, = running_monitor.slow_calls
+
+    assert slow_call.endpoint == '/endpoint'
+    assert slow_call.query == 'a=2'
+    assert slow_call.duration >= 0.1
+    assert slow_call.samples
+    assert any('busy_wait' in frame for frame in slow_call.samples[0].frames)
+
+    report = running_monitor.report(clear=True)
+    assert report.slowCalls == [slow_call]
+    assert not running_monitor.slow_calls
+
+
+async def test_lag(running_monitor):
+    await asyncio.sleep(0.05)
+
+    busy_wait(0.1)
+    await asyncio.sleep(0.05)
+
+    assert running_monitor.max_lag >= 0.05
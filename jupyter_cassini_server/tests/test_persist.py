@@ -0,0 +1,87 @@
+import atexit
+from unittest.mock import Mock
+
+import jupyter_cassini_server as extension
+
+from ..cache import tree_cache
+from ..config import config
+from ..persist import load_caches, save_caches, save_caches_in_background, snapshot_file
+
+
+def test_save_and_load(project_with_wps):
+    project = project_with_wps
+    home = project.home
+
+    tree_cache.get(home)
+    assert save_caches(project)
+    assert snapshot_file(project).exists()
+    assert not save_caches(project)
+
+    tree_cache.branches.clear()
+    assert load_caches(project) == 1
+
+    loaded = tree_cache.branches[home.folder.as_posix()]
+    assert loaded.children['2'].meta_value('status') == 'todo'
+
+    project['WP1'].meta['status'] = 'todo'
+    branch = tree_cache.get(home)
+
+    assert branch.children['1'].meta_value('status') == 'todo'
+    # only the changed child was serialised again.
+    assert branch.children['2'] is loaded.children['2']
+
+
+def test_load_bad_snapshot(project_with_wps, caplog):
+    project = project_with_wps
+    snapshot_file(project).write_bytes(b'not a pickle')
+
+    assert load_caches(project) == 0
+    assert str(snapshot_file(project)) in caplog.text
+    assert 'UnpicklingError' in caplog.text
+
+
+def test_load_missing_snapshot(project_with_wps):
+    assert load_caches(project_with_wps) == 0
+
+
+def test_save_after_change(project_with_wps):
+    project = project_with_wps
+
+    tree_cache.get(project.home)
+    assert save_caches(project)
+
+    project['WP1'].meta['status'] = 'todo'
+    tree_cache.get(project.home)
+
+    # same branches, but one has been replaced.
+    assert save_caches(project)
+
+
+async def test_save_in_background(project_with_wps):
+    project = project_with_wps
+
+    tree_cache.get(project.home)
+    assert await save_caches_in_background(project)
+    assert not save_caches(project)
+
+    tree_cache.branches.clear()
+    assert load_caches(project) == 1
+
+
+def test_saved_at_exit(project_with_wps, monkeypatch):
+    project = project_with_wps
+    registered = []
+
+    monkeypatch.setattr(config, 'CACHE_SNAPSHOT', True)
+    monkeypatch.setattr(config, 'CACHE_SNAPSHOT_INTERVAL', None)
+    monkeypatch.setattr(extension, 'setup_handlers', lambda web_app: None)
+    monkeypatch.setattr(atexit, 'register', lambda func, *args: registered.append((func, args)))
+
+    extension._load_jupyter_server_extension(Mock())
+    tree_cache.get(project.home)
+
+    [(shutdown, args)] = registered
+    shutdown(*args)
+
+    tree_cache.branches.clear()
+    assert load_caches(project) == 1
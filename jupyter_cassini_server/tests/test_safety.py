@@ -1,12 +1,14 @@
 from unittest.mock import Mock
 from urllib.parse import urlencode
 from http import HTTPStatus
+from typing import List
 
 import pytest
 from pydantic import BaseModel, ValidationError
 from tornado.web import HTTPError
 
-from ..safety import with_types, parse_get_query
+from ..config import config
+from ..safety import QueryCache, with_types, parse_get_query, parse_path_query, validate_get_query
 
 class Query(BaseModel):
     param: str
@@ -56,6 +58,55 @@ def test_query_parser_array():
     assert out == {'a[]': ['1', '2', '3', '4'], 'b[]': ['a', 'b', 'c']}
 
 
+def test_path_query_parser():
+    assert parse_path_query({'path': '/1/2'}) == {'path': ['1', '2']}
+    assert parse_path_query({'path': '1?a=b'}) == {'path': ['1']}
+    assert parse_path_query({'path': '/'}) == {'path': []}
+    assert parse_path_query({'path': ''}) == {'path': []}
+
+
+def test_validate_get_query_cached():
+    cache: QueryCache[Query] = QueryCache()
+
+    first = validate_get_query(Query, 'param=a', {}, cache)
+    assert first == Query(param='a')
+    assert validate_get_query(Query, 'param=a', {}, cache) == first
+    assert validate_get_query(Query, 'param=b', {}, cache) != first
+
+    with pytest.raises(ValidationError):
+        validate_get_query(Query, 'invalid=a', {}, cache)
+
+
+def test_query_cache_evicts(monkeypatch):
+    monkeypatch.setattr(config, 'QUERY_CACHE_SIZE', 2)
+    cache: QueryCache[Query] = QueryCache()
+
+    a = validate_get_query(Query, 'param=a', {}, cache)
+    validate_get_query(Query, 'param=b', {}, cache)
+    # a is now the most recently used.
+    validate_get_query(Query, 'param=a', {}, cache)
+    validate_get_query(Query, 'param=c', {}, cache)
+
+    assert cache.get(('param=b', ())) is None
+    assert cache.get(('param=a', ())) == a
+
+
+def test_query_cache_copies():
+    class PathQuery(BaseModel):
+        path: List[str]
+
+    cache: QueryCache[PathQuery] = QueryCache()
+
+    first = validate_get_query(PathQuery, '', {'path': '/1/2'}, cache)
+    first.path.pop()
+
+    second = validate_get_query(PathQuery, '', {'path': '/1/2'}, cache)
+    assert second.path == ['1', '2']
+    second.path.append('3')
+
+    assert validate_get_query(PathQuery, '', {'path': '/1/2'}, cache).path == ['1', '2']
+
+
 def test_get_all_valid():
     class Server(MockServer):
 
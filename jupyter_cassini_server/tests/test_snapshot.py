@@ -0,0 +1,48 @@
+from pathlib import Path
+
+from ..snapshot import DirSnapshot, stamp
+
+
+def test_snapshot_scans_once(tmp_path: Path):
+    for i in range(5):
+        (tmp_path / f'{i}.json').write_text('{}')
+    (tmp_path / 'folder').mkdir()
+
+    snapshot = DirSnapshot()
+
+    assert all(snapshot.is_file(tmp_path / f'{i}.json') for i in range(5))
+    assert snapshot.is_dir(tmp_path / 'folder')
+    assert not snapshot.exists(tmp_path / 'missing.json')
+
+    assert snapshot.scandirs == 1
+    assert snapshot.queries == 7
+    assert snapshot.saved == 6
+
+
+def test_snapshot_missing_folder(tmp_path: Path):
+    snapshot = DirSnapshot()
+
+    assert not snapshot.exists(tmp_path / 'missing' / 'file.json')
+    assert snapshot.stamp(tmp_path / 'missing' / 'file.json') == (0, 0)
+    assert snapshot.scandirs == 1
+
+
+def test_snapshot_stamp(tmp_path: Path):
+    file = tmp_path / 'file.json'
+    file.write_text('{"a": 1}')
+
+    snapshot = DirSnapshot()
+
+    assert snapshot.stamp(file) == stamp(file)
+    assert snapshot.stamp(file) == stamp(file)
+    assert snapshot.stats <= 1
+
+
+def test_snapshot_tier_exists(project_via_env):
+    project = project_via_env
+    project['WP1'].setup_files()
+
+    snapshot = DirSnapshot()
+
+    for name in ['Home', 'WP1', 'WP2', 'WP1.1']:
+        assert snapshot.tier_exists(project[name]) == project[name].exists()
@@ -13,9 +13,15 @@ import {
   TreeResponse,
   TreeChildResponse,
   NewChildInfo,
-  TierInfo
+  TierInfo,
+  TierSummary
 } from './schema/types';
-import { treeResponseToData, warnError } from './utils';
+import {
+  FrameBatcher,
+  treeResponseToData,
+  warnError,
+  whenIdle
+} from './utils';
 
 import { TierBrowser } from './ui/browser';
 import Ajv from 'ajv';
@@ -45,6 +51,11 @@ export interface ITreeChildData extends Omit<TreeChildResponse, 'started'> {
 
 export type TreeChildren = { [id: string]: ITreeChildData };
 
+/**
+ * Most names looked up in one request, see `TreeManager.resolve` and `TierModelTreeManager.get`.
+ */
+export const LOOKUP_BATCH_SIZE = 1000;
+
 /**
  * Looks after the 'tree' of tiers. Idea is to match the file structure of a cassini project. Because asking the server to generate this tree is
  * expensive, the treeManager looks after a cache of this structure.
@@ -59,10 +70,30 @@ export type TreeChildren = { [id: string]: ITreeChildData };
 export class TreeManager {
   cache: any;
   nameCache: { [name: string]: ITreeData }; // name -> identifiers
+  epoch: string | null; // of the server the generation came from
+  generation: number;
+  prefetchBudget: number; // most branches fetched ahead at once, 0 (the default) to never fetch ahead
+
+  protected _prefetching: Map<string, Promise<ITreeData | null>>; // ids joined by '/' -> fetch
+  protected _resolver: FrameBatcher<TierSummary>; // batches calls to resolve
 
   constructor() {
     this.cache = {};
     this.nameCache = {};
+    this.epoch = null;
+    this.generation = 0;
+    this.prefetchBudget = 0;
+    this._prefetching = new Map();
+    this._resolver = new FrameBatcher(
+      names => CassiniServer.lookupBatch(names).then(({ tiers }) => tiers),
+      name =>
+        new CasServerError(
+          'Not Found',
+          `/jupyter_cassini/lookupBatch?name=${encodeURIComponent(name)}`,
+          `No tier called ${name}`
+        ),
+      LOOKUP_BATCH_SIZE
+    );
   }
 
   private _changed = new Signal<
@@ -104,6 +135,13 @@ export class TreeManager {
       return this.fetchTierData(ids);
     }
 
+    const prefetching = this._prefetching.get(ids.join('/'));
+
+    if (prefetching) {
+      // already on its way, unless fetching ahead failed.
+      return prefetching.then(branch => branch || this.fetchTierData(ids));
+    }
+
     let branch = this.cache;
 
     for (const id of ids) {
@@ -140,8 +178,18 @@ export class TreeManager {
       return Promise.resolve(this.nameCache[name]);
     }
 
-    const tierInfo = await CassiniServer.lookup(name);
-    return this.get(tierInfo.ids);
+    const { ids } = await this.resolve(name);
+    return this.get(ids);
+  }
+
+  /**
+   * Find the ids and type of a tier by name, e.g. to render a link to it.
+   *
+   * Names resolved within one animation frame are looked up together in a single request, so rendering many links
+   * at once doesn't flood the server. Rejects with a `CasServerError` if there's no such tier.
+   */
+  resolve(name: string): Promise<TierSummary> {
+    return this._resolver.get(name);
   }
 
   /**
@@ -181,18 +229,111 @@ export class TreeManager {
     return branch;
   }
 
+  /**
+   * Bring the cache back up to date with the server, e.g. after the computer has been asleep or the connection dropped.
+   *
+   * Asks the server which tiers have changed since the last resync, and refetches those we have branches for. If the
+   * server has restarted since, it can't say what changed, so every branch we have is refetched.
+   *
+   * The first call just records the current generation.
+   */
+  async resync(): Promise<void> {
+    const firstSync = this.epoch === null;
+    const changes = await CassiniServer.changes(
+      firstSync ? undefined : this.generation
+    );
+
+    let changed: string[];
+
+    if (changes.epoch !== this.epoch) {
+      changed = firstSync ? [] : Object.keys(this.nameCache);
+    } else {
+      changed = Object.keys(changes.changed);
+    }
+
+    this.epoch = changes.epoch;
+    this.generation = changes.generation;
+
+    const stale = changed
+      .map(name => this.nameCache[name])
+      .filter(branch => branch?.children !== undefined);
+
+    await Promise.all(
+      stale.map(branch =>
+        // the tier may have been removed, in which case its parent will have been refetched anyway.
+        this.fetchTierData(branch.ids, false).catch(() => null)
+      )
+    );
+  }
+
   /**
    * Ask the cassini server to provide TreeData for a given set of ids/ indentifiers/ casPath.
    *
    * This will also update the cache with that data.
+   *
+   * @param followHints also fetch ahead the branches of children the server suggests, see `prefetch`.
    */
-  fetchTierData(ids: string[]): Promise<ITreeData | null> {
+  fetchTierData(ids: string[], followHints = true): Promise<ITreeData | null> {
     return CassiniServer.tree(ids).then(treeResponse => {
       const newTree = treeResponseToData(treeResponse, ids);
+      const branch = this.cacheTreeData(ids, newTree) as ITreeData;
 
-      return this.cacheTreeData(ids, newTree) as ITreeData;
+      if (followHints && treeResponse.prefetch) {
+        this.prefetch(ids, treeResponse.prefetch);
+      }
+
+      return branch;
     });
   }
+
+  /**
+   * Fetch the branches of children of the tier at `ids` in the background, once the browser is idle, so they're
+   * already cached when opened. The server suggests which children are worth it in `TreeResponse.prefetch`.
+   *
+   * At most `prefetchBudget` branches are fetched ahead at once, and branches fetched ahead don't lead to any more
+   * being fetched. Failures are ignored, the branch will just be fetched when it's opened.
+   *
+   * Nothing is fetched ahead unless `prefetchBudget` is set above 0, and the server has `PREFETCH_HINTS` on.
+   */
+  prefetch(ids: string[], childIds: string[]): void {
+    const children = this._cached(ids)?.children || {};
+
+    for (const id of childIds) {
+      if (this._prefetching.size >= this.prefetchBudget) {
+        return;
+      }
+
+      const childPath = [...ids, id];
+      const key = childPath.join('/');
+
+      if (
+        this._prefetching.has(key) ||
+        (children[id] as ITreeData | undefined)?.children !== undefined
+      ) {
+        continue;
+      }
+
+      const fetching = whenIdle()
+        .then(() => this.fetchTierData(childPath, false))
+        .catch(() => null)
+        .finally(() => this._prefetching.delete(key));
+
+      this._prefetching.set(key, fetching);
+    }
+  }
+
+  /**
+   * The cached branch at `ids`, if there is one.
+   */
+  protected _cached(ids: string[]): ITreeData | undefined {
+    let branch = this.cache;
+
+    for (const id of ids) {
+      branch = branch?.children?.[id];
+    }
+
+    return branch;
+  }
 }
 
 export type ITierModelTreeCache = {
@@ -207,8 +348,20 @@ export type ITierModelTreeCache = {
 export class TierModelTreeManager {
   cache: ITierModelTreeCache;
 
+  protected _fetcher: FrameBatcher<TierInfo>; // batches fetching tier info
+
   constructor() {
     this.cache = {};
+    this._fetcher = new FrameBatcher(
+      names => this._fetchInfos(names),
+      name =>
+        new CasServerError(
+          'Not Found',
+          `/jupyter_cassini/lookupBatch?name=${encodeURIComponent(name)}`,
+          `No tier called ${name}`
+        ),
+      LOOKUP_BATCH_SIZE
+    );
   }
 
   /**
@@ -227,6 +380,9 @@ export class TierModelTreeManager {
    * There is almost certainly a better way of doing this.
    *
    * I wanted this to be synchronus, but an alternative, which is probably sensible is to use the treeManager.lookup.
+   *
+   * Models fetched within one animation frame, e.g. by the headers and meta tables of a notebook as it renders, are
+   * looked up together in a single request.
    */
   get(name: string, forceRefresh?: boolean): Promise<TierModel> {
     const inCache = Object.keys(this.cache).includes(name);
@@ -234,16 +390,19 @@ export class TierModelTreeManager {
       return Promise.resolve(this.cache[name]);
     }
 
-    return CassiniServer.lookup(name).then(tierInfo => {
-      if (inCache) {
-        const oldModel = this.cache[name];
+    return this._fetcher.get(name).then(tierInfo => {
+      const oldModel = this.cache[name];
+
+      if (oldModel) {
         if (
+          inCache &&
           oldModel instanceof NotebookTierModel &&
           tierInfo.tierType === 'notebook'
         ) {
           oldModel.refresh(tierInfo);
         }
 
+        // may have been created by another call waiting on the same lookup.
         return oldModel;
       } else {
         const newModel = this._insertNewTierModel(name, tierInfo);
@@ -253,6 +412,21 @@ export class TierModelTreeManager {
     });
   }
 
+  /**
+   * Get the info of each tier in `names`. A single name is looked up with `/lookup`, which keeps the server's reason
+   * when it can't be found.
+   */
+  protected async _fetchInfos(
+    names: string[]
+  ): Promise<{ [name: string]: TierInfo }> {
+    if (names.length === 1) {
+      return { [names[0]]: await CassiniServer.lookup(names[0]) };
+    }
+
+    const { infos } = await CassiniServer.lookupBatch(names, true);
+    return infos || {};
+  }
+
   _insertNewTierModel(name: string, tierInfo: TierInfo) {
     let model: TierModel;
 
@@ -332,7 +506,11 @@ export class Cassini {
 
     this.treeManager
       .initialize()
-      .then(() => this.resolveReady(true))
+      .then(() => {
+        this.resolveReady(true);
+        this.treeManager.resync().catch(() => null);
+        this._watchConnection();
+      })
       .catch(() => {
         warnError(
           "Cassini can't find your project. You must explicitly launch jupyter lab with project.launch() or set CASSINI_PROJECT."
@@ -343,6 +521,24 @@ export class Cassini {
     return this.ready;
   }
 
+  /* istanbul ignore next */
+  /**
+   * Resync the tree whenever we might have missed changes, i.e. coming back online, or the page becoming visible
+   * again after the computer woke up.
+   */
+  protected _watchConnection(): void {
+    const resync = () => {
+      this.treeManager.resync().catch(() => null);
+    };
+
+    window.addEventListener('online', resync);
+    document.addEventListener('visibilitychange', () => {
+      if (document.visibilityState === 'visible') {
+        resync();
+      }
+    });
+  }
+
   /* istanbul ignore next */
   /**
    *
@@ -54,6 +54,51 @@ export interface paths {
     patch?: never;
     trace?: never;
   };
+  '/lookupBatch': {
+    parameters: {
+      query?: never;
+      header?: never;
+      path?: never;
+      cookie?: never;
+    };
+    get?: never;
+    put?: never;
+    /**
+     * Lookup many tiers
+     * @description Look up many tiers by name at once, responding with just enough info to link to each. Unlike `/lookup`, the
+     *     children of each tier aren't read, so this is cheap even for hundreds of names. With `info`, the full info
+     *     of each tier is sent as well, which saves a `/lookup` request per tier when rendering many of them.
+     */
+    post: {
+      parameters: {
+        query?: never;
+        header?: never;
+        path?: never;
+        cookie?: never;
+      };
+      requestBody?: {
+        content: {
+          'application/json': components['schemas']['LookupBatchRequest'];
+        };
+      };
+      responses: {
+        /** @description The tiers found */
+        200: {
+          headers: {
+            [name: string]: unknown;
+          };
+          content: {
+            'application/json': components['schemas']['LookupBatchResponse'];
+          };
+        };
+      };
+    };
+    delete?: never;
+    options?: never;
+    head?: never;
+    patch?: never;
+    trace?: never;
+  };
   '/tree/{ids}': {
     parameters: {
       query?: never;
@@ -63,11 +108,21 @@ export interface paths {
     };
     /**
      * View the tier tree
-     * @description Get the children of a particular tier (or home)
+     * @description Get the children of a particular tier (or home).
+     *
+     *     Children can optionally be sorted, filtered and paged. `sort` is the name of a child field, or
+     *     `additionalMeta.<key>`, prefix with `-` for descending order. `filter` takes the form `<field>:<value>`.
+     *     When sorting, `childOrder` gives the order of the children. When filtering or paging, `childCount` gives the
+     *     total number of matching children.
      */
     get: {
       parameters: {
-        query?: never;
+        query?: {
+          sort?: string;
+          filter?: string;
+          limit?: number;
+          offset?: number;
+        };
         header?: never;
         path: {
           ids: string;
@@ -85,6 +140,15 @@ export interface paths {
             'application/json': components['schemas']['TreeResponse'];
           };
         };
+        /** @description Invalid sort or filter */
+        400: {
+          headers: {
+            [name: string]: unknown;
+          };
+          content: {
+            'application/json': components['schemas']['CassiniErrorInfo'];
+          };
+        };
         /** @description Not Found */
         404: {
           headers: {
@@ -154,6 +218,441 @@ export interface paths {
     patch?: never;
     trace?: never;
   };
+  '/metaValue': {
+    parameters: {
+      query?: never;
+      header?: never;
+      path?: never;
+      cookie?: never;
+    };
+    /**
+     * Get a meta value
+     * @description Get a single meta value of a tier, for fetching values sent as a `LazyMetaValue` placeholder.
+     */
+    get: {
+      parameters: {
+        query: {
+          name: string;
+          key: string;
+        };
+        header?: never;
+        path?: never;
+        cookie?: never;
+      };
+      requestBody?: never;
+      responses: {
+        /** @description Value found */
+        200: {
+          headers: {
+            [name: string]: unknown;
+          };
+          content: {
+            'application/json': components['schemas']['MetaValueResponse'];
+          };
+        };
+        /** @description Not Found */
+        404: {
+          headers: {
+            [name: string]: unknown;
+          };
+          content: {
+            'application/json': components['schemas']['CassiniErrorInfo'];
+          };
+        };
+      };
+    };
+    put?: never;
+    post?: never;
+    delete?: never;
+    options?: never;
+    head?: never;
+    patch?: never;
+    trace?: never;
+  };
+  '/highlights': {
+    parameters: {
+      query?: never;
+      header?: never;
+      path?: never;
+      cookie?: never;
+    };
+    /**
+     * Get the highlights of a tier
+     * @description Stream the highlights file of a tier. Supports `Range` requests, so single entries can be fetched using the
+     *     byte ranges from `/highlightsIndex`, as well as conditional requests with `If-None-Match` and
+     *     `If-Modified-Since`.
+     */
+    get: {
+      parameters: {
+        query: {
+          name: string;
+        };
+        header?: never;
+        path?: never;
+        cookie?: never;
+      };
+      requestBody?: never;
+      responses: {
+        /** @description The highlights file */
+        200: {
+          headers: {
+            [name: string]: unknown;
+          };
+          content: {
+            'application/json': {
+              [key: string]: unknown;
+            };
+          };
+        };
+        /** @description The requested range of the highlights file */
+        206: {
+          headers: {
+            [name: string]: unknown;
+          };
+          content?: never;
+        };
+        /** @description Not modified */
+        304: {
+          headers: {
+            [name: string]: unknown;
+          };
+          content?: never;
+        };
+        /** @description Not Found */
+        404: {
+          headers: {
+            [name: string]: unknown;
+          };
+          content: {
+            'application/json': components['schemas']['CassiniErrorInfo'];
+          };
+        };
+      };
+    };
+    put?: never;
+    post?: never;
+    delete?: never;
+    options?: never;
+    head?: never;
+    patch?: never;
+    trace?: never;
+  };
+  '/highlightsIndex': {
+    parameters: {
+      query?: never;
+      header?: never;
+      path?: never;
+      cookie?: never;
+    };
+    /**
+     * Get an index of the highlights of a tier
+     * @description Get the titles of the highlights of a tier, along with their byte range in the highlights file.
+     */
+    get: {
+      parameters: {
+        query: {
+          name: string;
+        };
+        header?: never;
+        path?: never;
+        cookie?: never;
+      };
+      requestBody?: never;
+      responses: {
+        /** @description Index of the highlights */
+        200: {
+          headers: {
+            [name: string]: unknown;
+          };
+          content: {
+            'application/json': components['schemas']['HighlightsIndex'];
+          };
+        };
+        /** @description Not Found */
+        404: {
+          headers: {
+            [name: string]: unknown;
+          };
+          content: {
+            'application/json': components['schemas']['CassiniErrorInfo'];
+          };
+        };
+        /** @description The highlights file is corrupt */
+        500: {
+          headers: {
+            [name: string]: unknown;
+          };
+          content: {
+            'application/json': components['schemas']['CassiniErrorInfo'];
+          };
+        };
+      };
+    };
+    put?: never;
+    post?: never;
+    delete?: never;
+    options?: never;
+    head?: never;
+    patch?: never;
+    trace?: never;
+  };
+  '/export': {
+    parameters: {
+      query?: never;
+      header?: never;
+      path?: never;
+      cookie?: never;
+    };
+    /**
+     * Export the project tree
+     * @description Stream one `ExportRecord` per tier as newline delimited JSON, walking down from `root` (defaults to Home).
+     *     `tierClass` limits the records to tiers of that class e.g. `Sample`. Meta values are always sent in full,
+     *     never as a `LazyMetaValue` placeholder. A tier whose meta file is invalid still gets a record, with `error`
+     *     set, so one broken file doesn't stop the export.
+     */
+    get: {
+      parameters: {
+        query?: {
+          root?: string;
+          tierClass?: string;
+        };
+        header?: never;
+        path?: never;
+        cookie?: never;
+      };
+      requestBody?: never;
+      responses: {
+        /** @description The stream of records */
+        200: {
+          headers: {
+            [name: string]: unknown;
+          };
+          content: {
+            'application/x-ndjson': components['schemas']['ExportRecord'];
+          };
+        };
+        /** @description Not Found */
+        404: {
+          headers: {
+            [name: string]: unknown;
+          };
+          content: {
+            'application/json': components['schemas']['CassiniErrorInfo'];
+          };
+        };
+      };
+    };
+    put?: never;
+    post?: never;
+    delete?: never;
+    options?: never;
+    head?: never;
+    patch?: never;
+    trace?: never;
+  };
+  '/audit': {
+    parameters: {
+      query?: never;
+      header?: never;
+      path?: never;
+      cookie?: never;
+    };
+    /**
+     * Check every meta file against its meta model
+     * @description Stream `AuditRecord`s as newline delimited JSON while validating the meta file of every tier below `root`
+     *     (defaults to Home), in order of ids. `after` skips tiers up to and including that one, so an interrupted audit
+     *     can be resumed from the `last` tier of its latest `progress` record.
+     */
+    get: {
+      parameters: {
+        query?: {
+          root?: string;
+          after?: string;
+        };
+        header?: never;
+        path?: never;
+        cookie?: never;
+      };
+      requestBody?: never;
+      responses: {
+        /** @description The stream of records */
+        200: {
+          headers: {
+            [name: string]: unknown;
+          };
+          content: {
+            'application/x-ndjson': components['schemas']['AuditRecord'];
+          };
+        };
+        /** @description Not Found */
+        404: {
+          headers: {
+            [name: string]: unknown;
+          };
+          content: {
+            'application/json': components['schemas']['CassiniErrorInfo'];
+          };
+        };
+      };
+    };
+    put?: never;
+    post?: never;
+    delete?: never;
+    options?: never;
+    head?: never;
+    patch?: never;
+    trace?: never;
+  };
+  '/changes': {
+    parameters: {
+      query?: never;
+      header?: never;
+      path?: never;
+      cookie?: never;
+    };
+    /**
+     * Tiers changed since a generation
+     * @description Get the tiers that have changed since generation `since`. If `since` isn't given, `changed` is empty, which is
+     *     useful to get the current generation. Changes made outside the server are looked for at most every
+     *     `CHANGES_REFRESH_INTERVAL` seconds, so may only be reported by a later call.
+     */
+    get: {
+      parameters: {
+        query?: {
+          since?: number;
+        };
+        header?: never;
+        path?: never;
+        cookie?: never;
+      };
+      requestBody?: never;
+      responses: {
+        /** @description The changed tiers */
+        200: {
+          headers: {
+            [name: string]: unknown;
+          };
+          content: {
+            'application/json': components['schemas']['ChangesResponse'];
+          };
+        };
+      };
+    };
+    put?: never;
+    post?: never;
+    delete?: never;
+    options?: never;
+    head?: never;
+    patch?: never;
+    trace?: never;
+  };
+  '/updateMeta': {
+    parameters: {
+      query?: never;
+      header?: never;
+      path?: never;
+      cookie?: never;
+    };
+    get?: never;
+    put?: never;
+    /**
+     * Update the meta of many tiers
+     * @description Validate every update against the meta model of its tier, then write them all. If any update is invalid,
+     *     nothing is written, and the `message` of the error lists why each one failed. Updates start from the meta
+     *     file as it is, so a file that no longer validates can be fixed. Updates to the same tier are applied in turn.
+     *     If some valid updates can't be written, the rest still are, and the `message` of the error lists why each of
+     *     the failed ones couldn't be written.
+     */
+    post: {
+      parameters: {
+        query?: never;
+        header?: never;
+        path?: never;
+        cookie?: never;
+      };
+      requestBody?: {
+        content: {
+          'application/json': components['schemas']['MetaUpdateRequest'];
+        };
+      };
+      responses: {
+        /** @description The updates were written */
+        200: {
+          headers: {
+            [name: string]: unknown;
+          };
+          content: {
+            'application/json': components['schemas']['MetaUpdateResponse'];
+          };
+        };
+        /** @description Invalid updates */
+        400: {
+          headers: {
+            [name: string]: unknown;
+          };
+          content: {
+            'application/json': components['schemas']['CassiniErrorInfo'];
+          };
+        };
+        /** @description Some updates couldn't be written */
+        500: {
+          headers: {
+            [name: string]: unknown;
+          };
+          content: {
+            'application/json': components['schemas']['CassiniErrorInfo'];
+          };
+        };
+      };
+    };
+    delete?: never;
+    options?: never;
+    head?: never;
+    patch?: never;
+    trace?: never;
+  };
+  '/monitor': {
+    parameters: {
+      query?: never;
+      header?: never;
+      path?: never;
+      cookie?: never;
+    };
+    /**
+     * Event loop lag and slow calls
+     * @description Get how late the event loop is running, and the requests that blocked it for longest, along with the stacks
+     *     they were sampled at. `clear` forgets the slow calls once they're returned.
+     */
+    get: {
+      parameters: {
+        query?: {
+          clear?: boolean;
+        };
+        header?: never;
+        path?: never;
+        cookie?: never;
+      };
+      requestBody?: never;
+      responses: {
+        /** @description The state of the monitor */
+        200: {
+          headers: {
+            [name: string]: unknown;
+          };
+          content: {
+            'application/json': components['schemas']['MonitorResponse'];
+          };
+        };
+      };
+    };
+    put?: never;
+    post?: never;
+    delete?: never;
+    options?: never;
+    head?: never;
+    patch?: never;
+    trace?: never;
+  };
   '/newChild': {
     parameters: {
       query?: never;
@@ -294,6 +793,10 @@ export interface components {
     });
     TreePathQuery: {
       path: string[];
+      sort?: string;
+      filter?: string;
+      limit?: number;
+      offset?: number;
     };
     TreeChildResponse: {
       name: string;
@@ -314,7 +817,155 @@ export interface components {
       children: {
         [key: string]: components['schemas']['TreeChildResponse'];
       };
+      childOrder?: string[];
+      childCount?: number;
+      /**
+       * @description Ids of the children most likely to be opened next, most likely first. Their branches are worth fetching
+       *     ahead of time.
+       */
+      prefetch?: string[];
+    } & WithRequired<components['schemas']['TreeChildResponse'], 'name'>;
+    /** @description Placeholder for a meta value too large to send in `additionalMeta`. Fetch it with `/metaValue`. */
+    LazyMetaValue: {
+      'x-cas-lazy': boolean;
+      /** @enum {string} */
+      type: 'object' | 'array' | 'string' | 'number' | 'boolean' | 'null';
+      size: number;
+    };
+    MetaValueResponse: {
+      name: string;
+      key: string;
+      value: unknown;
+    };
+    /** @description A highlight, and the byte range of its outputs within the highlights file. */
+    HighlightEntry: {
+      title: string;
+      start: number;
+      end: number;
+      mimeTypes: string[];
+    };
+    HighlightsIndex: {
+      name: string;
+      hltsPath: string;
+      size: number;
+      entries: components['schemas']['HighlightEntry'][];
+    };
+    /** @description One line of the `/export` NDJSON stream. */
+    ExportRecord: {
+      ids: string[];
+      tierClass: string;
+      /** @description Why the tier's meta couldn't be read, in which case the fields that come from it are left out. */
+      error?: string;
     } & WithRequired<components['schemas']['TreeChildResponse'], 'name'>;
+    AuditError: {
+      /** @description Dotted path to the invalid value, empty if the whole file is invalid. */
+      loc: string;
+      msg: string;
+      type: string;
+    };
+    /**
+     * @description One line of the `/audit` NDJSON stream. `failure` records describe a meta file that doesn't match its tier's
+     *     meta model. `progress` records follow each batch of tiers checked, and a final `done` record ends the audit.
+     */
+    AuditRecord: {
+      /** @enum {string} */
+      kind: 'failure' | 'progress' | 'done';
+      /** @description Number of meta files checked so far. */
+      checked?: number;
+      /** @description Number of invalid meta files found so far. */
+      failed?: number;
+      /** @description Name of the last tier checked, pass this as `after` to resume the audit from here. */
+      last?: string;
+      name?: string;
+      metaPath?: string;
+      errors?: components['schemas']['AuditError'][];
+    };
+    /**
+     * @description Tiers that have changed since a generation. A tier changes when one of its children is created, removed or has
+     *     its meta edited, or when its own meta is edited. Generations only count up within one `epoch`, if the epoch
+     *     differs from the last one seen, the server has restarted and everything should be treated as changed.
+     */
+    ChangesResponse: {
+      epoch: string;
+      /** @description The current generation, pass this as `since` next time. */
+      generation: number;
+      /** @description Name of each changed tier -> generation it last changed at. */
+      changed: {
+        [key: string]: number;
+      };
+    };
+    /** @description Changes to make to the meta of one tier. */
+    MetaUpdate: {
+      name: string;
+      /** @description Keys to set, and their new values. */
+      set?: {
+        [key: string]: unknown;
+      };
+      /** @description Keys to remove. */
+      unset?: string[];
+    };
+    MetaUpdateRequest: {
+      updates: components['schemas']['MetaUpdate'][];
+    };
+    MetaUpdateResponse: {
+      /** @description Names of the updated tiers, each once. */
+      updated: string[];
+      /** @description Generation of the tree after the updates, see `/changes`. */
+      generation: number;
+    };
+    /** @description A call stack seen while sampling a slow call, outermost frame first. */
+    StackSample: {
+      frames: string[];
+      /** @description Number of samples that found the call at this stack. */
+      count: number;
+    };
+    /** @description A request whose handler blocked the event loop for longer than the slow call threshold. */
+    SlowCall: {
+      endpoint: string;
+      query: string;
+      /** Format: date-time */
+      started: string;
+      /** @description Seconds the handler blocked the event loop for. */
+      duration: number;
+      /** @description The most common stacks the handler was sampled at, most common first. */
+      samples: components['schemas']['StackSample'][];
+    };
+    MonitorResponse: {
+      /** @description Whether the monitor is running, see `MONITOR` in the config. */
+      enabled: boolean;
+      /** @description Seconds the event loop was late by, when last checked. */
+      lag: number;
+      /** @description Most seconds the event loop has been late by, since the monitor started. */
+      maxLag: number;
+      /** @description The most recent slow calls, oldest first. */
+      slowCalls: components['schemas']['SlowCall'][];
+    };
+    /** @description Just enough about a tier to link to it. */
+    TierSummary: {
+      ids: string[];
+      /** @enum {string} */
+      tierType: 'notebook' | 'folder';
+    };
+    LookupBatchRequest: {
+      names: string[];
+      /**
+       * @description Also respond with the full info of each tier, as `/lookup` would, in `infos`.
+       * @default false
+       */
+      info?: boolean;
+    };
+    LookupBatchResponse: {
+      /** @description Name of each tier found -> its summary. */
+      tiers: {
+        [key: string]: components['schemas']['TierSummary'];
+      };
+      /** @description Name of each tier found -> its info, only if `info` was requested. */
+      infos?: {
+        [key: string]: components['schemas']['TierInfo'];
+      };
+      /** @description Names that aren't valid, or whose tier doesn't exist. */
+      missing: string[];
+    };
     NewChildInfo: {
       id: string;
       parent: string;
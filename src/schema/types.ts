@@ -8,6 +8,7 @@ export type ChildClsNotebookInfo =
 
 export type TreeChildResponse = components['schemas']['TreeChildResponse'];
 export type TreeResponse = components['schemas']['TreeResponse'];
+export type TreeQuery = Omit<components['schemas']['TreePathQuery'], 'path'>;
 
 export type FolderTierInfo = components['schemas']['FolderTierInfo'];
 export type NotebookTierInfo = components['schemas']['NotebookTierInfo'];
@@ -15,6 +16,26 @@ export type TierInfo = components['schemas']['TierInfo'];
 
 export type NewChildInfo = components['schemas']['NewChildInfo'];
 
+export type LazyMetaValue = components['schemas']['LazyMetaValue'];
+export type MetaValueResponse = components['schemas']['MetaValueResponse'];
+
+export type HighlightEntry = components['schemas']['HighlightEntry'];
+export type HighlightsIndex = components['schemas']['HighlightsIndex'];
+
+export type ExportRecord = components['schemas']['ExportRecord'];
+
+export type AuditRecord = components['schemas']['AuditRecord'];
+
+export type ChangesResponse = components['schemas']['ChangesResponse'];
+
+export type MetaUpdate = components['schemas']['MetaUpdate'];
+
+export type MetaUpdateResponse = components['schemas']['MetaUpdateResponse'];
+
+export type TierSummary = components['schemas']['TierSummary'];
+
+export type LookupBatchResponse = components['schemas']['LookupBatchResponse'];
+
 export type Status = components['schemas']['Status'];
 
 export type ObjectDef = components['schemas']['objectDef'];
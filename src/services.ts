@@ -2,10 +2,24 @@
 import createClient from 'openapi-fetch';
 
 import { URLExt } from '@jupyterlab/coreutils';
+import { JSONArray } from '@lumino/coreutils';
 
 import { ServerConnection } from '@jupyterlab/services';
 import { paths } from './schema/schema';
-import { TierInfo, TreeResponse, NewChildInfo, Status } from './schema/types';
+import {
+  TierInfo,
+  TreeResponse,
+  TreeQuery,
+  NewChildInfo,
+  Status,
+  MetaValueResponse,
+  HighlightEntry,
+  HighlightsIndex,
+  ChangesResponse,
+  MetaUpdate,
+  MetaUpdateResponse,
+  LookupBatchResponse
+} from './schema/types';
 import { warnError } from './utils';
 
 export class CasServerError extends Error {
@@ -90,18 +104,51 @@ export namespace CassiniServer {
       });
   }
 
+  /**
+   * Lookup many tiers by name at once, getting just enough info to link to each.
+   *
+   * Prefer `TreeManager.resolve` or `TierModelTreeManager.get`, which gather lookups made close together into one
+   * of these.
+   *
+   * @param names the names of the tiers, at most 1000
+   * @param info also get the full info of each tier, as `lookup` would, in `infos`
+   * @returns Promise that resolves with the summary of each tier found, and the names that weren't.
+   */
+  export function lookupBatch(
+    names: string[],
+    info = false
+  ): Promise<LookupBatchResponse> {
+    return client
+      .POST('/lookupBatch', {
+        body: info ? { names: names, info: true } : { names: names }
+      })
+      .then(val => {
+        const { data, error, response } = val;
+        if (data) {
+          return val.data;
+        } else {
+          throw new CasServerError(error.reason, response.url, error.message);
+        }
+      });
+  }
+
   /**
    * Gets the 'tree' reprentation of a tier. This includes enough info to display a TierViewer, but also information about the tier's children
    * such that the TierBrowser TierTree or whatever can be rendered.
    *
    * @param ids the identifiers or casPath or path or ids of the tier you want to view tree data for
+   * @param query optionally sort, filter and page the children server-side e.g. `{ sort: '-started', limit: 20 }`
    * @returns
    */
-  export function tree(ids: string[]): Promise<TreeResponse> {
+  export function tree(
+    ids: string[],
+    query?: TreeQuery
+  ): Promise<TreeResponse> {
     return client
       .GET('/tree/{ids}', {
         params: {
-          path: { ids: ids.join('/') }
+          path: { ids: ids.join('/') },
+          query: query
         }
       })
       .then(val => {
@@ -135,6 +182,135 @@ export namespace CassiniServer {
       });
   }
 
+  /**
+   * Update the meta of many tiers in one request. The updates are all validated before any are written, so if one is
+   * invalid, none are made. If some can't be written, the rest still are, and the error lists the ones that failed.
+   *
+   * @param updates the keys to set and unset for each tier
+   * @returns Promise that resolves with the names of the updated tiers.
+   */
+  export function updateMeta(
+    updates: MetaUpdate[]
+  ): Promise<MetaUpdateResponse> {
+    return client
+      .POST('/updateMeta', {
+        body: { updates: updates }
+      })
+      .then(val => {
+        const { data, error, response } = val;
+        if (data) {
+          return val.data;
+        } else {
+          throw new CasServerError(error.reason, response.url, error.message);
+        }
+      });
+  }
+
+  /**
+   * Fetch a single meta value of a tier. Used to get values that were too big to be sent in `additionalMeta`, and so
+   * were replaced with a `LazyMetaValue`.
+   *
+   * @param name the name of the tier
+   * @param key the meta key to fetch
+   * @returns Promise that resolves with the value.
+   */
+  export function metaValue(
+    name: string,
+    key: string
+  ): Promise<MetaValueResponse> {
+    return client
+      .GET('/metaValue', {
+        params: {
+          query: { name: name, key: key }
+        }
+      })
+      .then(val => {
+        const { data, error, response } = val;
+        if (data) {
+          return val.data;
+        } else {
+          throw new CasServerError(error.reason, response.url, error.message);
+        }
+      });
+  }
+
+  /**
+   * Get the titles of a tier's highlights, along with where each one is in the highlights file.
+   *
+   * @param name the name of the tier
+   * @returns Promise that resolves with the index
+   */
+  export function highlightsIndex(name: string): Promise<HighlightsIndex> {
+    return client
+      .GET('/highlightsIndex', {
+        params: {
+          query: { name: name }
+        }
+      })
+      .then(val => {
+        const { data, error, response } = val;
+        if (data) {
+          return val.data;
+        } else {
+          throw new CasServerError(error.reason, response.url, error.message);
+        }
+      });
+  }
+
+  /**
+   * Fetch the outputs of a single highlight, using a range request, so the rest of the highlights file isn't downloaded.
+   *
+   * @param name the name of the tier
+   * @param entry the entry of the highlight from `highlightsIndex`
+   * @returns Promise that resolves with the outputs of the highlight
+   */
+  export async function highlight(
+    name: string,
+    entry: HighlightEntry
+  ): Promise<JSONArray> {
+    const url =
+      URLExt.join(settings.baseUrl, 'jupyter_cassini', 'highlights') +
+      URLExt.objectToQueryString({ name: name });
+
+    const response = await ServerConnection.makeRequest(
+      url,
+      {
+        method: 'GET',
+        headers: { Range: `bytes=${entry.start}-${entry.end - 1}` }
+      },
+      settings
+    );
+
+    if (!response.ok) {
+      throw new CasServerError(response.statusText, response.url);
+    }
+
+    return JSON.parse(await response.text());
+  }
+
+  /**
+   * Get the tiers that have changed since generation `since`.
+   *
+   * @param since generation from a previous call, leave out to just get the current generation
+   * @returns Promise that resolves with the changes.
+   */
+  export function changes(since?: number): Promise<ChangesResponse> {
+    return client
+      .GET('/changes', {
+        params: {
+          query: since === undefined ? {} : { since: since }
+        }
+      })
+      .then(val => {
+        const { data, response } = val;
+        if (data) {
+          return val.data;
+        } else {
+          throw new CasServerError(response.statusText, response.url);
+        }
+      });
+  }
+
   export function openTier(name: string): Promise<Status> {
     return client
       .GET('/open', {
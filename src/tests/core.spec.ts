@@ -28,7 +28,7 @@ import {
   mockCassini
 } from './tools';
 import { Notification } from '@jupyterlab/apputils';
-// import { signalToPromise } from '@jupyterlab/coreutils';
+import { signalToPromise } from '@jupyterlab/coreutils';
 
 describe('TreeManager', () => {
   beforeEach(() => {
@@ -42,6 +42,15 @@ describe('TreeManager', () => {
       '/lookup': [
         { query: { name: 'WP1' }, response: WP1_INFO },
         { query: { name: 'WP1.1' }, response: WP1_1_INFO }
+      ],
+      '/lookupBatch': [
+        {
+          body: { names: ['WP1'] },
+          response: {
+            tiers: { WP1: { ids: ['1'], tierType: 'notebook' } },
+            missing: []
+          }
+        }
       ]
     });
   });
@@ -166,6 +175,109 @@ describe('TreeManager', () => {
 
     expect(thirdLookup).toBe(thirdGet);
   });
+
+  test('resolve-batched', async () => {
+    const treeManager = new TreeManager();
+    const mock = mockServerAPI({
+      '/lookupBatch': [
+        {
+          body: { names: ['WP1', 'WP1.1', 'WP9'] },
+          response: {
+            tiers: {
+              WP1: { ids: ['1'], tierType: 'notebook' },
+              'WP1.1': { ids: ['1', '1'], tierType: 'notebook' }
+            },
+            missing: ['WP9']
+          }
+        }
+      ]
+    });
+
+    const wp1 = treeManager.resolve('WP1');
+    const wp1_1 = treeManager.resolve('WP1.1');
+    const wp1Again = treeManager.resolve('WP1');
+    const wp9 = treeManager.resolve('WP9');
+
+    await expect(wp1).resolves.toEqual({ ids: ['1'], tierType: 'notebook' });
+    await expect(wp1Again).resolves.toEqual({
+      ids: ['1'],
+      tierType: 'notebook'
+    });
+    await expect(wp1_1).resolves.toEqual({
+      ids: ['1', '1'],
+      tierType: 'notebook'
+    });
+    await expect(wp9).rejects.toThrowError('Not Found');
+
+    // all in one request.
+    expect(mock).toHaveBeenCalledTimes(1);
+  });
+
+  test('prefetch', async () => {
+    mockServerAPI({
+      '/tree/{ids}': [
+        { path: '', response: { ...HOME_TREE, prefetch: ['1'] } },
+        { path: '1', response: WP1_TREE }
+      ]
+    });
+
+    const treeManager = new TreeManager();
+    treeManager.prefetchBudget = 3;
+    await treeManager.initialize();
+
+    expect(treeManager.cache['children']['1']).not.toHaveProperty('children');
+
+    // fetched in the background.
+    const [, change] = await signalToPromise(treeManager.changed);
+    expect(change.ids).toEqual(['1']);
+    expect(treeManager.cache['children']['1']).toHaveProperty('children');
+  });
+
+  test('prefetch-off', async () => {
+    mockServerAPI({
+      '/tree/{ids}': [
+        { path: '', response: { ...HOME_TREE, prefetch: ['1'] } },
+        { path: '1', response: WP1_TREE }
+      ]
+    });
+
+    // off by default.
+    const treeManager = new TreeManager();
+    await treeManager.initialize();
+
+    await new Promise(resolve => setTimeout(resolve, 10));
+    expect(treeManager.cache['children']['1']).not.toHaveProperty('children');
+  });
+
+  test('resync', async () => {
+    mockServerAPI({
+      '/tree/{ids}': [
+        { path: '', response: HOME_TREE },
+        { path: '1', response: WP1_TREE }
+      ],
+      '/changes': [
+        { query: {}, response: { epoch: 'a', generation: 1, changed: {} } },
+        {
+          query: { since: '1' },
+          response: { epoch: 'a', generation: 2, changed: { WP1: 2 } }
+        }
+      ]
+    });
+
+    const treeManager = new TreeManager();
+    await treeManager.initialize();
+    const wp1 = (await treeManager.get(['1'])) as ITreeData;
+
+    await treeManager.resync();
+    expect(treeManager.generation).toBe(1);
+
+    // outdate it
+    wp1.name = 'outdated';
+
+    await treeManager.resync();
+    expect(treeManager.generation).toBe(2);
+    expect(wp1.name).toBe(WP1_TREE.name);
+  });
 });
 
 describe('TreeModelManager', () => {
@@ -210,6 +322,38 @@ describe('TreeModelManager', () => {
     expect(modelManager.cache['WP1.1']).toBe(second);
   });
 
+  test('batched', async () => {
+    const mock = mockServerAPI({
+      '/lookupBatch': [
+        {
+          body: { names: ['WP1', 'WP1.1', 'WP9'], info: true },
+          response: {
+            tiers: {
+              WP1: { ids: ['1'], tierType: 'notebook' },
+              'WP1.1': { ids: ['1', '1'], tierType: 'notebook' }
+            },
+            infos: { WP1: WP1_INFO, 'WP1.1': WP1_1_INFO },
+            missing: ['WP9']
+          }
+        }
+      ]
+    });
+
+    const first = modelManager.get('WP1');
+    const second = modelManager.get('WP1.1');
+    const firstAgain = modelManager.get('WP1');
+    const missing = modelManager.get('WP9');
+
+    expect(await first).toBeInstanceOf(NotebookTierModel);
+    expect(await firstAgain).toBe(await first);
+    expect(await second).not.toBe(await first);
+    await expect(missing).rejects.toThrowError('Not Found');
+
+    // all in one request.
+    expect(mock).toHaveBeenCalledTimes(1);
+    expect(modelManager.cache['WP1.1']).toBe(await second);
+  });
+
   test('force-refresh', async () => {
     const first = (await modelManager.get('WP1')) as NotebookTierModel;
     await first.ready;
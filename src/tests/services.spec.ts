@@ -178,3 +178,142 @@ describe('open', () => {
     ).rejects.toThrowError('Bad Request');
   });
 });
+
+describe('metaValue', () => {
+  beforeEach(() => {
+    mockServerAPI({
+      '/metaValue': [
+        {
+          query: { name: 'WP1', key: 'results' },
+          response: { name: 'WP1', key: 'results', value: [1, 2, 3] }
+        },
+        {
+          query: { name: 'WP1', key: 'bad request' },
+          response: {
+            reason: 'Bad Request',
+            message: 'Bad query'
+          } as CassiniErrorInfo,
+          status: 405
+        }
+      ]
+    });
+  });
+
+  test('valid', async () => {
+    const out = await CassiniServer.metaValue('WP1', 'results');
+    expect(out.value).toEqual([1, 2, 3]);
+  });
+
+  test('unknown key', async () => {
+    await expect(
+      async () => await CassiniServer.metaValue('WP1', 'bad request')
+    ).rejects.toThrowError('Bad Request');
+  });
+});
+
+describe('highlights', () => {
+  const entry = {
+    title: 'A Plot',
+    start: 10,
+    end: 20,
+    mimeTypes: ['text/plain']
+  };
+  const outputs = [{ data: { 'text/plain': 'plot' }, metadata: {} }];
+
+  beforeEach(() => {
+    mockServerAPI({
+      '/highlightsIndex': [
+        {
+          query: { name: 'WP1' },
+          response: {
+            name: 'WP1',
+            hltsPath: 'WorkPackages/.wps/WP1.hlts',
+            size: 100,
+            entries: [entry]
+          }
+        }
+      ],
+      '/highlights': [{ query: { name: 'WP1' }, response: outputs }]
+    });
+  });
+
+  test('index', async () => {
+    const out = await CassiniServer.highlightsIndex('WP1');
+    expect(out.entries).toEqual([entry]);
+  });
+
+  test('highlight', async () => {
+    const out = await CassiniServer.highlight('WP1', entry);
+    expect(out).toEqual(outputs);
+  });
+});
+
+describe('updateMeta', () => {
+  const updates = [{ name: 'WP1', set: { status: 'done' } }];
+
+  beforeEach(() => {
+    mockServerAPI({
+      '/updateMeta': [
+        {
+          body: { updates: updates },
+          response: { updated: ['WP1'], generation: 2 }
+        },
+        {
+          body: { updates: [{ name: 'WP9' }] },
+          response: {
+            reason: 'MetaUpdateError',
+            message: '{"WP9": "Tier does not exist"}'
+          } as CassiniErrorInfo,
+          status: 400
+        }
+      ]
+    });
+  });
+
+  test('valid', async () => {
+    const out = await CassiniServer.updateMeta(updates);
+    expect(out.updated).toEqual(['WP1']);
+  });
+
+  test('invalid', async () => {
+    await expect(
+      async () => await CassiniServer.updateMeta([{ name: 'WP9' }])
+    ).rejects.toThrowError('MetaUpdateError');
+  });
+});
+
+describe('lookupBatch', () => {
+  beforeEach(() => {
+    mockServerAPI({
+      '/lookupBatch': [
+        {
+          body: { names: ['WP1', 'WP9'] },
+          response: {
+            tiers: { WP1: { ids: ['1'], tierType: 'notebook' } },
+            missing: ['WP9']
+          }
+        },
+        {
+          body: { names: ['WP1'], info: true },
+          response: {
+            tiers: { WP1: { ids: ['1'], tierType: 'notebook' } },
+            infos: { WP1: WP1_INFO },
+            missing: []
+          }
+        }
+      ]
+    });
+  });
+
+  test('valid', async () => {
+    const out = await CassiniServer.lookupBatch(['WP1', 'WP9']);
+    expect(out.tiers['WP1'].ids).toEqual(['1']);
+    expect(out.missing).toEqual(['WP9']);
+    expect(out.infos).toBeUndefined();
+  });
+
+  test('info', async () => {
+    const out = await CassiniServer.lookupBatch(['WP1'], true);
+    expect(out.infos?.['WP1']).toEqual(WP1_INFO);
+  });
+});
@@ -35,6 +35,7 @@ import { CassiniServer } from '../services';
 import { homeIcon } from './icons';
 import { ObservableList } from '@jupyterlab/observables';
 import { CasServerError } from '../services';
+import { formatMetaValue } from '../utils';
 
 export interface ICasSearchProps {
   model: TierBrowserModel;
@@ -418,7 +419,7 @@ export function ChildrenTable(props: IChildrenTableProps) {
             cell: props => {
               return (
                 <span>
-                  <span>{props.getValue()}</span>
+                  <span>{formatMetaValue(props.getValue())}</span>
                 </span>
               );
             }
@@ -1,8 +1,13 @@
 import { Notification } from '@jupyterlab/apputils';
 
-import { TreeResponse, TreeChildResponse } from './schema/types';
+import {
+  TreeResponse,
+  TreeChildResponse,
+  LazyMetaValue
+} from './schema/types';
 import { ITreeData, ITreeChildData, TreeChildren } from './core';
 import { Widget } from '@lumino/widgets';
+import { PromiseDelegate } from '@lumino/coreutils';
 
 export function treeChildrenToData(children: {
   [id: string]: TreeChildResponse;
@@ -58,6 +63,152 @@ export function treeResponseToData(
   return newTree;
 }
 
+/**
+ * Check if an additionalMeta value is a placeholder for a value that was too big to send.
+ *
+ * The actual value can be fetched with `CassiniServer.metaValue`.
+ */
+export function isLazyMetaValue(value: unknown): value is LazyMetaValue {
+  return (
+    typeof value === 'object' &&
+    value !== null &&
+    (value as LazyMetaValue)['x-cas-lazy'] === true
+  );
+}
+
+/**
+ * Format an additionalMeta value for display in a table cell.
+ */
+export function formatMetaValue(value: unknown): string {
+  if (value === undefined || value === null) {
+    return '';
+  }
+
+  if (isLazyMetaValue(value)) {
+    return `<${value.type}, ${(value.size / 1000).toFixed(1)} kB>`;
+  }
+
+  if (typeof value === 'object') {
+    return JSON.stringify(value);
+  }
+
+  return String(value);
+}
+
+/**
+ * Resolves once the browser is idle, or after `timeout` ms at the latest.
+ *
+ * Falls back to the next turn of the event loop where `requestIdleCallback` isn't available.
+ */
+export function whenIdle(timeout = 2000): Promise<void> {
+  return new Promise(resolve => {
+    if (typeof window !== 'undefined' && window.requestIdleCallback) {
+      window.requestIdleCallback(() => resolve(), { timeout });
+    } else {
+      setTimeout(resolve, 0);
+    }
+  });
+}
+
+/**
+ * Resolves just before the browser next paints, so work queued while rendering a frame can be done together.
+ *
+ * Hidden pages don't paint, so there it falls back to the next turn of the event loop.
+ */
+export function nextFrame(): Promise<void> {
+  return new Promise(resolve => {
+    if (
+      typeof window !== 'undefined' &&
+      window.requestAnimationFrame &&
+      document.visibilityState === 'visible'
+    ) {
+      window.requestAnimationFrame(() => resolve());
+    } else {
+      setTimeout(resolve, 0);
+    }
+  });
+}
+
+/**
+ * Gathers the keys asked for within one animation frame (see `nextFrame`), so they can be fetched together.
+ *
+ * `fetch` is called with at most `size` keys at a time, and resolves with the value of each key it found. Keys it
+ * doesn't give a value for are rejected with the error made by `missing`.
+ */
+export class FrameBatcher<T> {
+  fetch: (keys: string[]) => Promise<{ [key: string]: T }>;
+  missing: (key: string) => Error;
+  size: number;
+
+  protected _pending: Map<string, PromiseDelegate<T>>; // keys waiting for the next batch
+
+  constructor(
+    fetch: (keys: string[]) => Promise<{ [key: string]: T }>,
+    missing: (key: string) => Error,
+    size: number
+  ) {
+    this.fetch = fetch;
+    this.missing = missing;
+    this.size = size;
+    this._pending = new Map();
+  }
+
+  /**
+   * Get the value of `key` with the next batch. Asking for the same key again before then shares its promise.
+   */
+  get(key: string): Promise<T> {
+    let pending = this._pending.get(key);
+
+    if (!pending) {
+      if (this._pending.size === 0) {
+        nextFrame().then(() => this._flush());
+      }
+
+      pending = new PromiseDelegate<T>();
+      this._pending.set(key, pending);
+    }
+
+    return pending.promise;
+  }
+
+  /**
+   * Fetch all the keys waiting for a value.
+   */
+  protected async _flush(): Promise<void> {
+    const batch = this._pending;
+    this._pending = new Map();
+
+    const keys = [...batch.keys()];
+    const chunks: string[][] = [];
+
+    for (let start = 0; start < keys.length; start += this.size) {
+      chunks.push(keys.slice(start, start + this.size));
+    }
+
+    await Promise.all(
+      chunks.map(async chunk => {
+        try {
+          const values = await this.fetch(chunk);
+
+          for (const key of chunk) {
+            const pending = batch.get(key) as PromiseDelegate<T>;
+
+            if (key in values) {
+              pending.resolve(values[key]);
+            } else {
+              pending.reject(this.missing(key));
+            }
+          }
+        } catch (error) {
+          for (const key of chunk) {
+            batch.get(key)?.reject(error);
+          }
+        }
+      })
+    );
+  }
+}
+
 export function warnError(notifyMessage: string, logMessage?: string): void {
   Notification.error('Cassini - ' + notifyMessage);
 